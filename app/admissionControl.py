@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from metrics import Counter, Gauge
+from microBatcher import MICROBATCH_MAX_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Requests allowed on the inference path at once (per worker process). Admitted requests hold
+# their slot while waiting on the NER micro-batcher, so fewer slots than its batch size would cap the batches
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", MICROBATCH_MAX_SIZE))
+# Requests allowed to wait for a slot; beyond this they are rejected at once with 429
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", 16))
+# Longest wait for a slot before giving up with 503
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_MS", 2000))
+# Default and maximum end-to-end budget of a request (X-Request-Deadline-Ms may lower it)
+REQUEST_DEADLINE_MS = float(os.environ.get("REQUEST_DEADLINE_MS", 10000))
+# Skip spellcheck while requests are queueing for a slot
+ADMISSION_DEGRADE = os.environ.get("ADMISSION_DEGRADE", "1") == "1"
+
+SHED = Counter("admission_shed_total", "Requests rejected or abandoned by admission control, by reason "
+               "(queue_full, queue_timeout, deadline).", labelnames=("reason",))
+DEGRADED = Counter("admission_degraded_total", "Requests served without spellcheck because the worker was saturated.")
+
+
+class Rejected(Exception):
+    """A request turned away by admission control; carries the HTTP status to answer with."""
+
+    def __init__(self, status: int, reason: str, retry_after: int = 1):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before its work finished."""
+
+
+def request_deadline(header_value: Optional[str]) -> float:
+    """
+    Compute a request's deadline on the time.monotonic() clock.
+
+    Args:
+        header_value: The X-Request-Deadline-Ms header (remaining budget in ms), if any
+
+    Returns:
+        float: The deadline; never later than REQUEST_DEADLINE_MS from now
+    """
+    budget = REQUEST_DEADLINE_MS
+    if header_value:
+        try:
+            budget = min(budget, max(0.0, float(header_value)))
+        except ValueError:
+            pass
+    return time.monotonic() + budget / 1000
+
+
+def check_deadline(deadline: Optional[float], stage: str) -> None:
+    """
+    Raise DeadlineExceeded if the deadline has passed, so no further work is started.
+
+    Args:
+        deadline: Deadline on the time.monotonic() clock, or None for no deadline
+        stage: The stage about to start, for the error message and the shed counter
+    """
+    if deadline is not None and time.monotonic() >= deadline:
+        SHED.inc(reason="deadline")
+        raise DeadlineExceeded(f"Deadline passed before {stage}")
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit with a bounded wait queue in front of the inference path.
+
+    Up to max_in_flight requests run at once. Further requests wait, at most
+    max_queue of them and no longer than queue_timeout or their deadline; the
+    rest are rejected immediately. While anyone is waiting the controller
+    reports itself saturated, which callers use to degrade (skip spellcheck).
+    """
+
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT, max_queue: int = ADMISSION_MAX_QUEUE,
+                 queue_timeout_ms: float = ADMISSION_QUEUE_TIMEOUT_MS):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0.0, queue_timeout_ms) / 1000
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        Gauge("admission_in_flight", "Requests currently on the inference path.", lambda: self.in_flight)
+        Gauge("admission_queue_depth", "Requests waiting for an inference slot.", lambda: self.waiting)
+
+    def saturated(self) -> bool:
+        """True while requests are queueing for a slot."""
+        return self.waiting > 0
+
+    @contextmanager
+    def admit(self, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold an inference slot for the duration of the with-block.
+
+        Args:
+            deadline: The request's deadline on the time.monotonic() clock
+
+        Raises:
+            Rejected: 429 if the wait queue is full, 503 if no slot freed up in time
+        """
+        with self._condition:
+            if self.in_flight >= self.max_in_flight:
+                if self.waiting >= self.max_queue:
+                    SHED.inc(reason="queue_full")
+                    raise Rejected(429, "Too many requests queued")
+                wait_until = time.monotonic() + self.queue_timeout
+                if deadline is not None:
+                    wait_until = min(wait_until, deadline)
+                self.waiting += 1
+                try:
+                    while self.in_flight >= self.max_in_flight:
+                        remaining = wait_until - time.monotonic()
+                        if remaining <= 0:
+                            SHED.inc(reason="queue_timeout")
+                            raise Rejected(503, "Timed out waiting for an inference slot")
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify()
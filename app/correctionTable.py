@@ -0,0 +1,93 @@
+import json
+import logging
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT_VERSION = 1
+
+
+class CorrectionTable:
+    """
+    Frozen map of known misspellings to their corrections.
+
+    Keys are lowercase word cores (see spellCorrector.classify_token). A value
+    equal to its key records a token the corrector has no suggestion for, so
+    that miss is answered in O(1) as well.
+    """
+
+    def __init__(self, entries: Mapping[str, str], corpus_size: Optional[int] = None):
+        self._entries = MappingProxyType(dict(entries))
+        self.corpus_size = corpus_size
+
+    def get(self, word: str) -> Optional[str]:
+        """
+        Return the stored correction for a lowercase word.
+
+        Args:
+            word: The lowercase word core
+
+        Returns:
+            Optional[str]: The correction, or None if the word is not in the table
+        """
+        return self._entries.get(word)
+
+    def __contains__(self, word) -> bool:
+        return word in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def entries(self) -> Mapping[str, str]:
+        """Read-only view of the table."""
+        return self._entries
+
+    def save(self, path: str) -> None:
+        """
+        Write the table to disk as JSON.
+
+        Args:
+            path: Destination file path
+        """
+        state = {
+            "version": TABLE_FORMAT_VERSION,
+            "corpus_size": self.corpus_size,
+            "entries": dict(sorted(self._entries.items())),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=0)
+        logger.info(f"Correction table with {len(self)} entries saved to {path}")
+
+    @classmethod
+    def load(cls, path: str, corpus_size: Optional[int] = None) -> Optional["CorrectionTable"]:
+        """
+        Load a table written by save().
+
+        Args:
+            path: Path to the table file
+            corpus_size: If given, reject a table built against a corpus of a different size
+
+        Returns:
+            Optional[CorrectionTable]: The table, or None if it is missing, invalid or stale
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            logger.info(f"No correction table at {path}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding correction table {path}: {e}")
+            return None
+
+        if state.get("version") != TABLE_FORMAT_VERSION:
+            logger.warning(f"Correction table {path} has an unsupported format version")
+            return None
+        if corpus_size is not None and state.get("corpus_size") != corpus_size:
+            logger.warning(f"Correction table {path} was built against a different corpus; ignoring it")
+            return None
+        entries: Dict[str, str] = state.get("entries", {})
+        logger.info(f"Correction table with {len(entries)} entries loaded from {path}")
+        return cls(entries, state.get("corpus_size"))
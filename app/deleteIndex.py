@@ -0,0 +1,197 @@
+import argparse
+import logging
+import pickle
+import time
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from editDistance import bounded_distance, rank_candidates
+from vocabFile import load_vocabulary
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """
+    Generate every string reachable from word by removing up to max_distance characters.
+
+    Args:
+        word: The word to delete characters from
+        max_distance: Maximum number of characters to remove
+
+    Returns:
+        Set[str]: The word itself plus all of its deletes
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for item in frontier:
+            if len(item) > 1:
+                for i in range(len(item)):
+                    next_frontier.add(item[:i] + item[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+class DeleteIndex:
+    """
+    Symmetric-delete candidate index (SymSpell style) over a word list.
+
+    Every corpus word is stored under all strings obtained by deleting up to
+    max_distance characters from its first prefix_length characters. A lookup
+    generates the same deletes for the query, so finding every word within the
+    edit distance costs a few dictionary probes plus a bounded verification
+    of the (small) candidate set.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.corpus_size = 0
+        # A delete key maps to a single word or, when shared, a list of words
+        self._deletes: Dict[str, Union[str, List[str]]] = {}
+
+    @classmethod
+    def build(cls, words: Iterable[str], max_distance: int = 2, prefix_length: int = 7) -> "DeleteIndex":
+        """
+        Build an index from an iterable of lowercase words.
+
+        Args:
+            words: The corpus words
+            max_distance: Maximum edit distance supported by lookups
+            prefix_length: Number of leading characters used to generate deletes
+
+        Returns:
+            DeleteIndex: The populated index
+        """
+        index = cls(max_distance, prefix_length)
+        deletes = index._deletes
+        count = 0
+        for word in words:
+            count += 1
+            for key in _deletes(word[:prefix_length], max_distance):
+                entry = deletes.get(key)
+                if entry is None:
+                    deletes[key] = word
+                elif isinstance(entry, str):
+                    deletes[key] = [entry, word]
+                else:
+                    entry.append(word)
+        index.corpus_size = count
+        logger.info(f"Built delete index over {count} words with {len(deletes)} keys")
+        return index
+
+    def candidates(self, word: str) -> Dict[str, int]:
+        """
+        Find every indexed word within max_distance edits of word.
+
+        Deletes never go down to the empty string, so a word sharing no character
+        with the query (possible only when both are at most max_distance long) is
+        not reported; its difflib similarity is 0, below any lookup cutoff.
+
+        Args:
+            word: The lowercase word to look up
+
+        Returns:
+            Dict[str, int]: Candidate words mapped to their edit distance
+        """
+        found: Dict[str, int] = {}
+        rejected: Set[str] = set()
+        for key in _deletes(word[:self.prefix_length], self.max_distance):
+            entry = self._deletes.get(key)
+            if entry is None:
+                continue
+            for candidate in ((entry,) if isinstance(entry, str) else entry):
+                if candidate in found or candidate in rejected:
+                    continue
+                distance = bounded_distance(word, candidate, self.max_distance)
+                if distance <= self.max_distance:
+                    found[candidate] = distance
+                else:
+                    rejected.add(candidate)
+        return found
+
+    def lookup(self, word: str, n: int = 1, cutoff: float = 0.6) -> List[str]:
+        """
+        Return the best corrections for word, closest first.
+
+        Args:
+            word: The lowercase word to look up
+            n: Maximum number of suggestions to return
+            cutoff: Minimum difflib similarity ratio for a suggestion
+
+        Returns:
+            List[str]: Up to n suggestions
+        """
+        return rank_candidates(word, self.candidates(word), n, cutoff)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to disk so worker processes can skip the build.
+
+        Args:
+            path: Destination file path
+        """
+        state = {
+            "version": INDEX_FORMAT_VERSION,
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "corpus_size": self.corpus_size,
+            "deletes": self._deletes,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Delete index saved to {path}")
+
+    @classmethod
+    def load(cls, path: str, corpus_size: Optional[int] = None) -> Optional["DeleteIndex"]:
+        """
+        Load a prebuilt index from disk.
+
+        Args:
+            path: Path written by save()
+            corpus_size: If given, reject an index built from a corpus of a different size
+
+        Returns:
+            Optional[DeleteIndex]: The index, or None if it is missing or stale
+        """
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            logger.info(f"No prebuilt delete index at {path}")
+            return None
+        except (pickle.UnpicklingError, EOFError) as e:
+            logger.error(f"Error unpickling delete index {path}: {e}")
+            return None
+
+        if state.get("version") != INDEX_FORMAT_VERSION:
+            logger.warning(f"Delete index {path} has an unsupported format version")
+            return None
+        if corpus_size is not None and state["corpus_size"] != corpus_size:
+            logger.warning(f"Delete index {path} was built from a different corpus; ignoring it")
+            return None
+
+        index = cls(state["max_distance"], state["prefix_length"])
+        index.corpus_size = state["corpus_size"]
+        index._deletes = state["deletes"]
+        logger.info(f"Delete index loaded from {path}")
+        return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild the spell-correction delete index.")
+    parser.add_argument('--corpus', type=str, default='app/customCorpus.vocab', help='Path to the .vocab or pickled corpus')
+    parser.add_argument('--out', type=str, default='app/customCorpus.index', help='Path to write the index to')
+    parser.add_argument('--max_distance', type=int, default=2, help='Maximum edit distance to index')
+    parser.add_argument('--prefix_length', type=int, default=7, help='Leading characters used for deletes')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    corpus = load_vocabulary(args.corpus)
+    start = time.perf_counter()
+    DeleteIndex.build(corpus, args.max_distance, args.prefix_length).save(args.out)
+    print(f"Indexed {len(corpus)} words in {time.perf_counter() - start:.1f}s -> {args.out}")
@@ -0,0 +1,84 @@
+import difflib
+from typing import Dict, List
+
+
+def bounded_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Compute the optimal string alignment distance between two words, giving up early.
+
+    Insertions, deletions, substitutions and adjacent transpositions each cost 1.
+    Only the diagonal band of width 2 * max_distance + 1 is evaluated, and the
+    computation stops as soon as every cell in a row exceeds max_distance.
+
+    Args:
+        source: The first word
+        target: The second word
+        max_distance: The largest distance worth computing exactly
+
+    Returns:
+        int: The edit distance, or max_distance + 1 if it exceeds max_distance
+    """
+    if source == target:
+        return 0
+    len_s, len_t = len(source), len(target)
+    if abs(len_s - len_t) > max_distance:
+        return max_distance + 1
+    if len_s == 0 or len_t == 0:
+        return max(len_s, len_t)
+
+    too_far = max_distance + 1
+    # prev2/prev/cur are rows i-2, i-1 and i of the DP matrix over target positions
+    prev2 = None
+    prev = list(range(len_t + 1))
+    for i in range(1, len_s + 1):
+        cur = [too_far] * (len_t + 1)
+        lo = max(1, i - max_distance)
+        hi = min(len_t, i + max_distance)
+        if lo == 1:
+            cur[0] = i
+        source_char = source[i - 1]
+        row_min = cur[0] if lo == 1 else too_far
+        for j in range(lo, hi + 1):
+            cost = 0 if source_char == target[j - 1] else 1
+            value = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (prev2 is not None and j > 1 and source_char == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                value = min(value, prev2[j - 2] + 1)
+            cur[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        prev2, prev = prev, cur
+    return prev[len_t] if prev[len_t] <= max_distance else too_far
+
+
+def rank_candidates(word: str, found: Dict[str, int], n: int = 1, cutoff: float = 0.6) -> List[str]:
+    """
+    Order verified candidates the way every engine reports them.
+
+    Candidates are ranked by edit distance, then by difflib similarity so that
+    ties resolve the way difflib.get_close_matches would, and anything below
+    the difflib cutoff is dropped.
+
+    Args:
+        word: The lowercase word being corrected
+        found: Candidate words mapped to their edit distance from word
+        n: Maximum number of suggestions to return
+        cutoff: Minimum difflib similarity ratio for a suggestion
+
+    Returns:
+        List[str]: Up to n suggestions, closest first
+    """
+    if not found:
+        return []
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(word)
+    scored = []
+    for candidate, distance in found.items():
+        matcher.set_seq1(candidate)
+        ratio = matcher.ratio()
+        if ratio >= cutoff:
+            scored.append((distance, -ratio, candidate))
+    scored.sort()
+    return [candidate for _, _, candidate in scored[:n]]
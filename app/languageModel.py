@@ -0,0 +1,263 @@
+import argparse
+import bisect
+import logging
+import math
+import pickle
+import re
+from array import array
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+ID_BITS = 21  # up to ~2M distinct tokens; three ids fit in one unsigned 64-bit key
+BOS = "<s>"
+EOS = "</s>"
+BACKOFF = 0.4  # stupid-backoff multiplier
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['\-/.][a-z0-9]+)*")
+
+
+def normalize_token(token: str) -> str:
+    """
+    Reduce a raw whitespace token to the form the language model is trained on.
+
+    Args:
+        token: A token as produced by str.split()
+
+    Returns:
+        str: The lowercase core of the token, or "" if it has no word characters
+    """
+    match = TOKEN_PATTERN.search(token.lower())
+    return match.group(0) if match else ""
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized language model tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TrigramLanguageModel:
+    """
+    Word trigram model with stupid-backoff scoring and array-backed storage.
+
+    Token ids index an unsigned int array of unigram counts. Bigram and trigram
+    counts are stored as sorted arrays of packed 64-bit id keys with parallel
+    count arrays, so a lookup is a bisect and the whole model is a handful of
+    flat arrays plus the vocabulary.
+    """
+
+    def __init__(self):
+        self.vocab = {}
+        self.total = 0
+        self._unigrams = array("I")
+        self._bigram_keys = array("Q")
+        self._bigram_counts = array("I")
+        self._trigram_keys = array("Q")
+        self._trigram_counts = array("I")
+
+    @classmethod
+    def train(cls, sentences: Iterable[Sequence[str]], min_count: int = 1) -> "TrigramLanguageModel":
+        """
+        Count unigrams, bigrams and trigrams over tokenized sentences.
+
+        Args:
+            sentences: Iterable of token lists (see tokenize)
+            min_count: Drop bigrams and trigrams seen fewer times than this
+
+        Returns:
+            TrigramLanguageModel: The trained model
+        """
+        model = cls()
+        vocab = model.vocab
+        for token in (BOS, EOS):
+            vocab[token] = len(vocab)
+        unigrams = Counter()
+        bigrams = Counter()
+        trigrams = Counter()
+        shift = ID_BITS
+        for sentence in sentences:
+            ids = [0, 0]
+            for token in sentence:
+                token_id = vocab.get(token)
+                if token_id is None:
+                    token_id = vocab[token] = len(vocab)
+                ids.append(token_id)
+            ids.append(1)
+            unigrams.update(ids[2:])
+            for i in range(2, len(ids)):
+                bigrams[(ids[i - 1] << shift) | ids[i]] += 1
+                trigrams[(((ids[i - 2] << shift) | ids[i - 1]) << shift) | ids[i]] += 1
+            # Count the sentence-start context so P(w | <s>) has a denominator
+            unigrams[0] += 1
+            bigrams[0] += 1
+
+        if len(vocab) >= 1 << ID_BITS:
+            raise ValueError(f"Vocabulary of {len(vocab)} tokens exceeds the {ID_BITS}-bit id space")
+        model._unigrams = array("I", [0] * len(vocab))
+        for token_id, count in unigrams.items():
+            model._unigrams[token_id] = count
+        model.total = sum(unigrams.values())
+        model._bigram_keys, model._bigram_counts = cls._freeze(bigrams, min_count)
+        model._trigram_keys, model._trigram_counts = cls._freeze(trigrams, min_count)
+        logger.info(f"Trained trigram model: {len(vocab)} tokens, {len(model._bigram_keys)} bigrams, "
+                    f"{len(model._trigram_keys)} trigrams")
+        return model
+
+    @staticmethod
+    def _freeze(counts: Counter, min_count: int):
+        """Convert a Counter of packed keys into sorted key and count arrays."""
+        keys = sorted(key for key, count in counts.items() if count >= min_count)
+        return array("Q", keys), array("I", (counts[key] for key in keys))
+
+    @staticmethod
+    def _count(keys: array, counts: array, key: int) -> int:
+        i = bisect.bisect_left(keys, key)
+        return counts[i] if i < len(keys) and keys[i] == key else 0
+
+    def _id(self, token: str) -> Optional[int]:
+        return self.vocab.get(token)
+
+    def log_prob(self, u: str, v: str, w: str) -> float:
+        """
+        Stupid-backoff log10 score of w following the context (u, v).
+
+        Args:
+            u: Token two positions back
+            v: Previous token
+            w: Token being scored
+
+        Returns:
+            float: log10 score; unknown tokens get an add-one unigram floor
+        """
+        w_id = self._id(w)
+        if w_id is None or self._unigrams[w_id] == 0:
+            return math.log10(1 / (self.total + len(self.vocab)))
+        u_id, v_id = self._id(u), self._id(v)
+        shift = ID_BITS
+        penalty = 1.0
+        if u_id is not None and v_id is not None:
+            trigram = self._count(self._trigram_keys, self._trigram_counts,
+                                  (((u_id << shift) | v_id) << shift) | w_id)
+            if trigram:
+                context = self._count(self._bigram_keys, self._bigram_counts, (u_id << shift) | v_id)
+                if context:
+                    return math.log10(trigram / context)
+            penalty *= BACKOFF
+        if v_id is not None:
+            bigram = self._count(self._bigram_keys, self._bigram_counts, (v_id << shift) | w_id)
+            if bigram and self._unigrams[v_id]:
+                return math.log10(penalty * bigram / self._unigrams[v_id])
+            penalty *= BACKOFF
+        else:
+            penalty *= BACKOFF
+        return math.log10(penalty * self._unigrams[w_id] / self.total)
+
+    def score_candidate(self, left: Sequence[str], candidate: str, right: Sequence[str]) -> float:
+        """
+        Score a candidate using only the trigrams that contain it.
+
+        Args:
+            left: Up to two preceding normalized tokens
+            candidate: The candidate token
+            right: Up to two following normalized tokens
+
+        Returns:
+            float: Sum of log10 scores of the trigrams covering candidate
+        """
+        left = [BOS] * (2 - len(left)) + list(left[-2:])
+        right = list(right[:2]) + [EOS] * (2 - len(right))
+        score = self.log_prob(left[0], left[1], candidate)
+        score += self.log_prob(left[1], candidate, right[0])
+        if right[0] != EOS:
+            score += self.log_prob(candidate, right[0], right[1])
+        return score
+
+    def best_candidate(self, left: Sequence[str], candidates: Sequence[str], right: Sequence[str]) -> str:
+        """
+        Pick the candidate that fits its context best; ties keep the engine's order.
+
+        Args:
+            left: Preceding raw tokens (only the last two are used)
+            candidates: Candidate corrections, best first; may carry the token's punctuation
+            right: Following raw tokens (only the first two are used)
+
+        Returns:
+            str: The chosen candidate
+        """
+        left_ctx = [t for t in (normalize_token(t) for t in left[-2:]) if t]
+        right_ctx = [t for t in (normalize_token(t) for t in right[:2]) if t]
+        best, best_score = candidates[0], float("-inf")
+        for candidate in candidates:
+            # Scored on its normalized core, like the context ("board," -> "board")
+            score = self.score_candidate(left_ctx, normalize_token(candidate), right_ctx)
+            if score > best_score:
+                best, best_score = candidate, score
+        return best
+
+    def save(self, path: str) -> None:
+        """
+        Write the model to disk.
+
+        Args:
+            path: Destination file path
+        """
+        tokens = [None] * len(self.vocab)
+        for token, token_id in self.vocab.items():
+            tokens[token_id] = token
+        state = {
+            "version": MODEL_FORMAT_VERSION,
+            "tokens": "\n".join(tokens),
+            "total": self.total,
+            "unigrams": self._unigrams,
+            "bigram_keys": self._bigram_keys,
+            "bigram_counts": self._bigram_counts,
+            "trigram_keys": self._trigram_keys,
+            "trigram_counts": self._trigram_counts,
+        }
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.info(f"Language model saved to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "TrigramLanguageModel":
+        """
+        Load a model written by save().
+
+        Args:
+            path: Path to the model file
+
+        Returns:
+            TrigramLanguageModel: The loaded model
+
+        Raises:
+            ValueError: If the file has an unsupported format version
+        """
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Language model {path} has an unsupported format version")
+        model = cls()
+        model.vocab = {token: i for i, token in enumerate(state["tokens"].split("\n"))}
+        model.total = state["total"]
+        model._unigrams = state["unigrams"]
+        model._bigram_keys = state["bigram_keys"]
+        model._bigram_counts = state["bigram_counts"]
+        model._trigram_keys = state["trigram_keys"]
+        model._trigram_counts = state["trigram_counts"]
+        logger.info(f"Language model loaded from {path}")
+        return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the trigram language model used to rerank spelling candidates.")
+    parser.add_argument('--corpus', type=str, default='product_corpus.pkl',
+                        help='Pickled list of product documents written by Ner/corpusCreator.py')
+    parser.add_argument('--out', type=str, default='app/product.lm', help='Path to write the model to')
+    parser.add_argument('--min_count', type=int, default=1, help='Minimum bigram/trigram count to keep')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with open(args.corpus, "rb") as f:
+        documents = pickle.load(f)
+    TrigramLanguageModel.train((tokenize(doc) for doc in documents), args.min_count).save(args.out)
@@ -0,0 +1,220 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Optional
+
+from metrics import Counter, Gauge
+
+# "-" writes to stderr instead (set by gunicorn.conf.py: several workers cannot share a rotating file)
+LOG_FILE = os.environ.get("LOG_FILE", "logs/main.log")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# "json" (one object per line) or "text" (the former "time - level - message" lines)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+# Size-based rotation: the file is rolled over at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+# Records waiting for the writer thread; when full, new records are dropped rather than blocking a request
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+# Per-token messages allowed per second (burst of the same size) before they are suppressed
+LOG_TOKEN_RATE = float(os.environ.get("LOG_TOKEN_RATE", 10))
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+SUPPRESSED = Counter("log_records_suppressed_total", "Per-token log records suppressed by rate limiting.",
+                     labelnames=("logger",))
+
+_REQUEST_ID: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+# Attributes every LogRecord has; anything else was passed through extra= and is written as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_QUEUE_HANDLER: Optional["DroppingQueueHandler"] = None
+
+
+class LazyJson:
+    """Log argument rendered as JSON only when the record is written, on the writer thread (value must not change)."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        return json.dumps(self.value)
+
+
+# Arguments that cannot change after the logging call, so formatting them can wait for the writer thread
+_DEFERRABLE_ARGS = (str, int, float, bool, type(None), LazyJson)
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """
+    Tag the log records of the current thread's request with an id.
+
+    Args:
+        request_id: The id, or None to clear it
+
+    Returns:
+        contextvars.Token: Pass to reset_request_id when the request ends
+    """
+    return _REQUEST_ID.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    """Restore the request id that was current before set_request_id."""
+    _REQUEST_ID.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object: ts, level, logger, message, request_id, pid and any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller and leaves formatting to the writer thread.
+
+    The request thread only stamps the request id and puts the record on a
+    bounded queue; %-formatting of immutable arguments, JSON encoding and I/O
+    happen in the QueueListener. A full queue drops the record and counts it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        request_id = _REQUEST_ID.get()
+        if request_id is not None and not hasattr(record, "request_id"):
+            record.request_id = request_id
+        # Resolve the message now if an argument could be mutated after the call returns
+        if record.args and not (isinstance(record.args, tuple)
+                                and all(isinstance(arg, _DEFERRABLE_ARGS) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.inc()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket for high-volume messages (e.g. one per token): at most `rate` records
+    per second with bursts of the same size. The next record let through after a
+    suppression notes how many were dropped.
+    """
+
+    def __init__(self, rate: float = LOG_TOKEN_RATE):
+        super().__init__()
+        self.rate = max(0.0, rate)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                self.suppressed += 1
+                SUPPRESSED.inc(logger=record.name)
+                return False
+            self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def _file_handler(path: str) -> logging.Handler:
+    """Size-rotated file handler, or a stderr handler for path "-"."""
+    formatter = JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT)
+    if path == "-":
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(formatter)
+        return handler
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(path, mode="a", maxBytes=LOG_MAX_BYTES,
+                                                   backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    handler.setFormatter(formatter)
+    return handler
+
+
+def _start_listener(*handlers: logging.Handler) -> None:
+    """Give the queue handler a fresh queue and start a writer thread draining it into handlers."""
+    global _LISTENER
+    log_queue: queue.Queue = queue.Queue(maxsize=max(1, LOG_QUEUE_SIZE))
+    _QUEUE_HANDLER.queue = log_queue
+    _LISTENER = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _LISTENER.start()
+
+
+def _restart_after_fork() -> None:
+    """
+    The writer thread does not survive a fork (e.g. gunicorn workers forked from a
+    preloaded master), and the inherited queue's lock may be held by it. Start a
+    new queue and thread in the child, writing to the same handlers.
+    """
+    if _LISTENER is not None:
+        _start_listener(*_LISTENER.handlers)
+
+
+def _stop_listener() -> None:
+    """Flush the queued records at exit."""
+    if _LISTENER is not None and _LISTENER._thread is not None:
+        _LISTENER.stop()
+
+
+def configure_logging(path: str = LOG_FILE, level: str = LOG_LEVEL) -> None:
+    """
+    Route the root logger through a bounded queue to a background writer thread.
+
+    Records are written to a size-rotated file (stderr for "-"), as JSON lines by
+    default (LOG_FORMAT=text keeps the plain format). Calling it again has no effect.
+
+    Args:
+        path: The log file, or "-" for stderr
+        level: Root logger level name
+    """
+    global _QUEUE_HANDLER
+    if _QUEUE_HANDLER is not None:
+        return
+    _QUEUE_HANDLER = DroppingQueueHandler(queue.Queue())
+    _start_listener(_file_handler(path))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_QUEUE_HANDLER)
+    os.register_at_fork(after_in_child=_restart_after_fork)
+    atexit.register(_stop_listener)
+    Gauge("log_queue_depth", "Log records waiting for the writer thread.", lambda: _QUEUE_HANDLER.queue.qsize())
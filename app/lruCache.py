@@ -0,0 +1,208 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache with hit/miss/eviction counters.
+    """
+
+    def __init__(self, maxsize: int = 50000):
+        self.maxsize = max(0, maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for key and mark it most recently used.
+
+        Args:
+            key: The cache key
+            default: Value returned when key is not cached
+
+        Returns:
+            The cached value, or default on a miss
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are kept so they stay monotonic."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the cache counters.
+
+        Returns:
+            Dict[str, Any]: size, maxsize, hits, misses, evictions and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def approx_size(obj: Any) -> int:
+    """
+    Approximate the memory footprint of a value in bytes.
+
+    Follows str/bytes, lists, tuples, sets and dicts recursively; other objects
+    are counted with sys.getsizeof only.
+
+    Args:
+        obj: The value to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item) for item in obj)
+    return size
+
+
+class ByteLRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the approximate byte size of
+    its entries rather than their count, with an optional time-to-live.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = approx_size):
+        self.max_bytes = max(0, max_bytes)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self._sizeof = sizeof
+        # key -> (value, size in bytes, expiry time or None)
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for key and mark it most recently used.
+
+        Args:
+            key: The cache key
+            default: Value returned when key is not cached or has expired
+
+        Returns:
+            The cached value, or default on a miss
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries until the byte budget holds.
+        Values larger than the whole budget are not stored.
+
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        size = self._sizeof(key) + self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size, expires)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry. Counters are kept so they stay monotonic."""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return a snapshot of the cache counters.
+
+        Returns:
+            Dict[str, Any]: size, bytes, max_bytes, ttl, hits, misses, evictions,
+            expirations and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
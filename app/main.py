@@ -29,27 +29,474 @@
 
 #     main(use_spellcheck=args.spellcheck)
 
+import importlib
+import json
 import logging
-from flask import Flask, request, render_template_string
-from ner import load_model, extract_entities
-from spellCorrector import correct_text, load_corpus
-import pdb
-
-# Load the SpaCy model and custom corpus once at startup
-nlp = load_model()
-load_corpus("app/customCorpus.pkl")
-
-# Configure logging to file
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/main.log', mode='a'),
-    ]
-)
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Flask, Response, g, request, render_template_string, jsonify, stream_with_context
+from spellCorrector import correct_text, correct_texts, load_corpus, load_language_model, load_correction_table, get_cache_stats
+from nerCache import NerResultCache, normalize_text
+from memoryReport import process_memory
+from microBatcher import MicroBatcher
+from metrics import INPUT_CHARS, STAGE_SECONDS, Gauge, render_metrics
+from requestProfiler import RequestProfiler
+from admissionControl import (ADMISSION_DEGRADE, DEGRADED, SHED, AdmissionController, DeadlineExceeded, Rejected,
+                              check_deadline, request_deadline)
+from logPipeline import LazyJson, configure_logging, reset_request_id, set_request_id
+
+# Configure logging to logs/main.log (stderr under gunicorn): records are queued on the
+# request thread and written as JSON lines by a background thread
+configure_logging()
+
+# Startup state: the SpaCy model (and the spaCy import itself) and the spell resources
+# load concurrently in the background so the server can bind immediately.
+STARTUP = {"state": "starting", "error": None, "timeline": {}}
+RESOURCES = {"ner": None, "nlp": None, "ner_cache": None, "batcher": None}
+# Coalesce concurrent single-text requests into nlp.pipe batches (see microBatcher.py)
+NER_MICROBATCH = os.environ.get("NER_MICROBATCH", "1") == "1"
+READY = threading.Event()
+_STARTUP_LOCK = threading.Lock()
+
+def _timed(stage, fn, *args, **kwargs):
+    """Run fn and record its wall time in the startup timeline."""
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        with _STARTUP_LOCK:
+            STARTUP["timeline"][stage] = round(time.perf_counter() - start, 3)
+
+def _load_ner_resources():
+    ner = _timed("spacy_import", importlib.import_module, "ner")
+    RESOURCES["nlp"] = _timed("model_load", ner.load_model)
+    RESOURCES["ner_cache"] = NerResultCache(ner.MODEL_PATH)
+    if NER_MICROBATCH:
+        nlp = RESOURCES["nlp"]
+        RESOURCES["batcher"] = MicroBatcher(lambda texts: ner.extract_entities_batch(texts, nlp, batch_size=len(texts)))
+    RESOURCES["ner"] = ner
+
+def _load_spell_resources():
+    _timed("corpus_load", load_corpus, "app/customCorpus.vocab", index_path="app/customCorpus.index")
+    # Optional; corrections are context-free without it
+    _timed("language_model_load", load_language_model, "app/product.lm")
+    # Optional; built by spellcheck/build_correction_table.py
+    _timed("correction_table_load", load_correction_table, "app/corrections.json")
+
+def load_resources():
+    """
+    Load the SpaCy model and the spell resources concurrently and mark the app ready.
+    Blocks until both have finished; failures are recorded in STARTUP["error"].
+    """
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+            futures = [pool.submit(_load_ner_resources), pool.submit(_load_spell_resources)]
+            for future in futures:
+                future.result()
+        STARTUP["state"] = "ready"
+    except Exception as e:
+        logging.error(f"Startup failed: {e}")
+        STARTUP["state"] = "failed"
+        STARTUP["error"] = str(e)
+    finally:
+        STARTUP["timeline"]["total"] = round(time.perf_counter() - start, 3)
+        READY.set()
+        logging.info(f"Startup {STARTUP['state']}; timeline (s): {STARTUP['timeline']}")
+
+def start_background_loading():
+    """Start load_resources on a daemon thread and return immediately."""
+    threading.Thread(target=load_resources, name="resource-loader", daemon=True).start()
+
+# NER_BACKGROUND_LOAD=0 loads synchronously at import (e.g. before a pre-forking server forks)
+if os.environ.get("NER_BACKGROUND_LOAD", "1") == "1":
+    start_background_loading()
+else:
+    load_resources()
+
+# Limits of the JSON API
+API_MAX_TEXTS = int(os.environ.get("API_MAX_TEXTS", 64))
+API_MAX_TEXT_CHARS = int(os.environ.get("API_MAX_TEXT_CHARS", 20000))
+API_MAX_PAYLOAD_BYTES = int(os.environ.get("API_MAX_PAYLOAD_BYTES", 1024 * 1024))
+# Streaming API: records processed per batch (bounds memory regardless of upload size)
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", 32))
+# Bytes per read from the upload stream
+STREAM_READ_BYTES = 64 * 1024
 
 # Initialize Flask app
 app = Flask(__name__)
+PROFILER = RequestProfiler()
+# Per-worker limit on concurrent inference requests (each gunicorn worker has its own)
+ADMISSION = AdmissionController()
+# Probes and scrapes: not logged per request nor sampled by the profiler
+PROBE_PATHS = {"/healthz", "/readyz", "/metrics"}
+
+@app.before_request
+def tag_request():
+    """Give the request an id (X-Request-Id if the client sent one) that tags its log records."""
+    g.request_start = time.perf_counter()
+    g.request_id = request.headers.get("X-Request-Id") or uuid.uuid4().hex[:16]
+    g.request_id_token = set_request_id(g.request_id)
+
+@app.after_request
+def log_request(response):
+    """Log one structured record per request (status, duration and the route's log_fields) and echo the id."""
+    response.headers["X-Request-Id"] = g.request_id
+    if request.path not in PROBE_PATHS:
+        duration_ms = round((time.perf_counter() - g.request_start) * 1000, 2)
+        logging.info(f"{request.method} {request.path} {response.status_code}",
+                     extra={"status": response.status_code, "duration_ms": duration_ms, **g.get("log_fields", {})})
+    return response
+
+@app.teardown_request
+def untag_request(exc):
+    """Clear the request id from the thread's logging context."""
+    token = g.pop("request_id_token", None)
+    if token is not None:
+        reset_request_id(token)
+
+@app.before_request
+def set_request_deadline():
+    """Start the request's deadline clock (X-Request-Deadline-Ms may shorten the default budget)."""
+    g.deadline = request_deadline(request.headers.get("X-Request-Deadline-Ms"))
+
+@app.errorhandler(Rejected)
+def admission_rejected(e):
+    """429/503 for a request shed by admission control, with a Retry-After hint."""
+    return jsonify({"error": e.reason}), e.status, {"Retry-After": str(e.retry_after)}
+
+@app.errorhandler(TimeoutError)
+@app.errorhandler(FutureTimeoutError)
+def deadline_exceeded(e):
+    """503 for a request whose deadline passed before its work finished."""
+    return jsonify({"error": "Request deadline exceeded"}), 503, {"Retry-After": "1"}
+
+def _effective_spellcheck(use_spellcheck):
+    """Skip spellcheck while requests are queueing for a slot (ADMISSION_DEGRADE); returns the flag to use."""
+    if use_spellcheck and ADMISSION_DEGRADE and ADMISSION.saturated():
+        DEGRADED.inc()
+        g.degraded = True
+        return False
+    return use_spellcheck
+
+@app.before_request
+def start_request_profile():
+    """Profile this request if it carries an authorised X-Profile flag or is sampled (probes are not)."""
+    if PROFILER.requested(request.headers, sample=request.path not in PROBE_PATHS):
+        g.profiler = PROFILER.start()
+
+@app.after_request
+def stop_request_profile(response):
+    """Write the request's profile to the ring and return its id in X-Profile-Id."""
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    label = f"{request.method} {request.path}"
+    if response.is_streamed:
+        # The body is generated after this hook, on the same thread; stop once it has been sent
+        profile_id = PROFILER.new_id(label)
+        response.call_on_close(lambda: PROFILER.stop(profiler, label, profile_id))
+    else:
+        profile_id = PROFILER.stop(profiler, label)
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+@app.teardown_request
+def release_request_profile(exc):
+    """Stop a profile left running by a request that raised."""
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        PROFILER.stop(profiler, f"{request.method} {request.path} failed")
+
+def _not_ready_response():
+    """503 response returned while the model is still loading (or failed to load)."""
+    message = "Service is starting, please retry shortly" if STARTUP["state"] == "starting" else "Service failed to start"
+    return message, 503, {"Retry-After": "5"}
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    Liveness probe: the process is up and serving HTTP.
+    Returns:
+        JSON object with the startup state
+    """
+    return jsonify({"status": "ok", "state": STARTUP["state"]})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """
+    Readiness probe with the startup timeline (import, model load and corpus load times).
+    Returns:
+        200 with the timeline once ready, 503 while starting or after a failed startup
+    """
+    status = 200 if STARTUP["state"] == "ready" else 503
+    return jsonify(STARTUP), status
+
+def analyze_text(text, use_spellcheck, deadline=None):
+    """
+    Spell-correct (optionally) and extract entities, answering repeated texts from the result cache.
+    Args:
+        text: The raw input text
+        use_spellcheck: Whether to correct the text before extraction
+        deadline: time.monotonic() deadline; no stage is started after it passes
+    Returns:
+        Tuple of (text the entities were extracted from, list of entities)
+    Raises:
+        DeadlineExceeded: If the deadline passes before the work is done
+    """
+    normalized = normalize_text(text)
+
+    def compute():
+        corrected = normalized
+        if use_spellcheck:
+            check_deadline(deadline, "spellcheck")
+            with STAGE_SECONDS.time(stage="spellcheck"):
+                corrected = correct_text(normalized)
+        check_deadline(deadline, "ner")
+        ner, nlp, batcher = RESOURCES["ner"], RESOURCES["nlp"], RESOURCES["batcher"]
+        with STAGE_SECONDS.time(stage="ner"):
+            # Texts of at most one window join other concurrent requests in one batch, tokenized once here
+            # (profiled requests run the pipeline in their own thread so cProfile sees it)
+            doc = nlp.make_doc(corrected) if batcher is not None and not g.get("profiler") and corrected else None
+            if doc is not None and len(doc) <= ner.MAX_WINDOW_TOKENS:
+                try:
+                    return corrected, batcher(doc, deadline)
+                except (TimeoutError, FutureTimeoutError):
+                    # Dropped from (or abandoned in) the batcher queue
+                    SHED.inc(reason="deadline")
+                    raise DeadlineExceeded("Deadline passed in the micro-batch queue") from None
+            # Long pasted descriptions are processed in overlapping windows
+            return corrected, ner.extract_entities_windowed(corrected, nlp)
+
+    (corrected_text, ents), _ = RESOURCES["ner_cache"].get_or_compute(normalized, use_spellcheck, compute)
+    return corrected_text, ents
+
+def analyze_texts(texts, use_spellcheck, deadline=None):
+    """
+    Batched analyze_text: cache hits are answered directly, the misses go through
+    batched spell correction and length-bucketed NER together.
+    Args:
+        texts: The raw input texts
+        use_spellcheck: Whether to correct the texts before extraction
+        deadline: time.monotonic() deadline; no stage is started after it passes
+    Returns:
+        Tuple of (list of (analyzed text, entities, cached) per text, dict of stage timings in ms)
+    Raises:
+        DeadlineExceeded: If the deadline passes before the work is done
+    """
+    ner, nlp, cache = RESOURCES["ner"], RESOURCES["nlp"], RESOURCES["ner_cache"]
+    normalized = [normalize_text(text) for text in texts]
+    results = [cache.lookup(text, use_spellcheck) for text in normalized]
+    misses = [i for i, result in enumerate(results) if result is None]
+
+    start = time.perf_counter()
+    miss_texts = [normalized[i] for i in misses]
+    if use_spellcheck and misses:
+        check_deadline(deadline, "spellcheck")
+    corrected = list(correct_texts(miss_texts)) if use_spellcheck else miss_texts
+    spellcheck_ms = (time.perf_counter() - start) * 1000
+
+    if misses:
+        check_deadline(deadline, "ner")
+    start = time.perf_counter()
+    # Texts longer than one window (in spaCy tokens) go through the windowed path; the rest are
+    # tokenized once here and bucketed by length
+    docs = [nlp.make_doc(text) if text else text for text in corrected]
+    long_texts = {j for j, doc in enumerate(docs) if len(doc) > ner.MAX_WINDOW_TOKENS}
+    short = [j for j in range(len(corrected)) if j not in long_texts]
+    entities = dict(zip(short, ner.extract_entities_bucketed([docs[j] for j in short], nlp)))
+    for j in long_texts:
+        entities[j] = ner.extract_entities_windowed(corrected[j], nlp)
+    ner_ms = (time.perf_counter() - start) * 1000
+    if misses:
+        STAGE_SECONDS.observe(spellcheck_ms / 1000, stage="spellcheck")
+        STAGE_SECONDS.observe(ner_ms / 1000, stage="ner")
+
+    for j, i in enumerate(misses):
+        results[i] = (corrected[j], entities[j])
+        cache.store(normalized[i], use_spellcheck, results[i])
+    missed = set(misses)
+    analyzed = [(text, ents, i not in missed) for i, (text, ents) in enumerate(results)]
+    return analyzed, {"spellcheck": round(spellcheck_ms, 2), "ner": round(ner_ms, 2)}
+
+def _api_error(message, status):
+    """JSON error response of the API."""
+    return jsonify({"error": message}), status
+
+@app.route("/api/v1/extract", methods=["POST"])
+def api_extract():
+    """
+    Extract entities from a batch of texts.
+    Request JSON: {"texts": [str, ...], "spellcheck": bool (optional, default false)}
+    Returns:
+        JSON object with one result per text ({"text": analyzed text, "entities": [{"text", "label",
+        "start", "end"}], "cached": bool}; offsets refer to "text"), timing_ms and "degraded" when
+        spellcheck was skipped under load; 400 on invalid input, 413 when a limit is exceeded, 429/503
+        when shed by admission control or past the deadline, 503 before the model is loaded
+    """
+    start = time.perf_counter()
+    if STARTUP["state"] != "ready":
+        return _not_ready_response()
+    # Read at most one byte past the limit; the streaming endpoint has no overall limit
+    body = request.stream.read(API_MAX_PAYLOAD_BYTES + 1)
+    if len(body) > API_MAX_PAYLOAD_BYTES:
+        return _api_error(f"Request body exceeds {API_MAX_PAYLOAD_BYTES} bytes", 413)
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict) or not isinstance(payload.get("texts"), list):
+        return _api_error('Expected a JSON object with a "texts" array', 400)
+    texts = payload["texts"]
+    use_spellcheck = payload.get("spellcheck", False)
+    if not isinstance(use_spellcheck, bool):
+        return _api_error('"spellcheck" must be a boolean', 400)
+    if not all(isinstance(text, str) for text in texts):
+        return _api_error('Every item of "texts" must be a string', 400)
+    if len(texts) > API_MAX_TEXTS:
+        return _api_error(f"At most {API_MAX_TEXTS} texts per request", 413)
+    if any(len(text) > API_MAX_TEXT_CHARS for text in texts):
+        return _api_error(f"Texts are limited to {API_MAX_TEXT_CHARS} characters", 413)
+
+    for text in texts:
+        INPUT_CHARS.observe(len(text))
+    with ADMISSION.admit(g.deadline):
+        use_spellcheck = _effective_spellcheck(use_spellcheck)
+        analyzed, timing = analyze_texts(texts, use_spellcheck, g.deadline)
+    timing["total"] = round((time.perf_counter() - start) * 1000, 2)
+    STAGE_SECONDS.observe(timing["total"] / 1000, stage="total")
+    g.log_fields = {"texts": len(texts), "spellcheck": use_spellcheck, "timing_ms": timing}
+    response = {
+        "results": [{"text": text, "entities": ents, "cached": cached} for text, ents, cached in analyzed],
+        "timing_ms": timing,
+    }
+    if g.get("degraded"):
+        response["degraded"] = True
+    return jsonify(response)
+
+def _stream_lines(stream, max_line_bytes, chunk_size=STREAM_READ_BYTES):
+    """
+    Split a stream into lines using fixed-size reads (readline on the raw WSGI stream reads byte by byte).
+    Args:
+        stream: The WSGI input stream
+        max_line_bytes: Longest accepted line, without its newline
+        chunk_size: Bytes per read
+    Yields:
+        Each line without its newline, or None for a line longer than max_line_bytes (never buffered whole)
+    """
+    buffer = bytearray()
+    oversized = False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            yield None if oversized or end - start > max_line_bytes else bytes(buffer[start:end])
+            oversized = False
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > max_line_bytes:
+            # Drop the partial line as it grows; it is reported once its newline arrives
+            oversized = True
+            buffer.clear()
+    if oversized:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
+
+def _ndjson_records(stream, max_line_bytes, max_text_chars=None):
+    """
+    Read newline-delimited JSON records from a request stream one line at a time.
+    Args:
+        stream: The WSGI input stream
+        max_line_bytes: Longest accepted line; longer lines are skipped and reported
+        max_text_chars: Longest accepted "text"; longer records are skipped and reported
+    Yields:
+        Tuple of (line number, record dict or None, error message or None)
+    """
+    for line_no, line in enumerate(_stream_lines(stream, max_line_bytes), start=1):
+        if line is None:
+            yield line_no, None, f"Line exceeds {max_line_bytes} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict) or not isinstance(record.get("text"), str):
+            yield line_no, None, 'Expected a JSON object with a "text" string'
+        elif max_text_chars is not None and len(record["text"]) > max_text_chars:
+            yield line_no, None, f"Texts are limited to {max_text_chars} characters"
+        else:
+            yield line_no, record, None
+
+@app.route("/api/v1/extract/stream", methods=["POST"])
+def api_extract_stream():
+    """
+    Extract entities from a stream of newline-delimited JSON records.
+    Request body: one {"text": str, "id": any (optional)} object per line; ?spellcheck=1 enables correction.
+    Records are processed in batches of STREAM_BATCH_SIZE, so memory stays flat for any upload size.
+    Each batch passes admission control and gets its own deadline (X-Request-Deadline-Ms applies per batch).
+    Returns:
+        NDJSON stream with one {"id", "text", "entities", "cached"} line per record (id defaults to the
+        line number) or {"line", "error"} for an invalid line or a text over API_MAX_TEXT_CHARS, written
+        as each batch finishes. A batch shed under load ends the stream with {"from_line", "error"};
+        resend from that line.
+    """
+    if STARTUP["state"] != "ready":
+        return _not_ready_response()
+    use_spellcheck = request.args.get("spellcheck", "0").lower() in ("1", "true", "on")
+    # Multi-byte characters: a line of API_MAX_TEXT_CHARS characters plus its JSON envelope
+    max_line_bytes = API_MAX_TEXT_CHARS * 4 + 1024
+    stream = request.stream
+    deadline_header = request.headers.get("X-Request-Deadline-Ms")
+
+    def process(batch):
+        deadline = request_deadline(deadline_header)
+        with ADMISSION.admit(deadline):
+            analyzed, _ = analyze_texts([record["text"] for _, record in batch],
+                                        _effective_spellcheck(use_spellcheck), deadline)
+        for (line_no, record), (text, ents, cached) in zip(batch, analyzed):
+            result = {"id": record.get("id", line_no), "text": text, "entities": ents, "cached": cached}
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    def generate():
+        start = time.perf_counter()
+        batch, records, errors = [], 0, 0
+        try:
+            for line_no, record, error in _ndjson_records(stream, max_line_bytes, API_MAX_TEXT_CHARS):
+                if error is not None:
+                    errors += 1
+                    yield json.dumps({"line": line_no, "error": error}) + "\n"
+                    continue
+                records += 1
+                batch.append((line_no, record))
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    yield from process(batch)
+                    batch = []
+            if batch:
+                yield from process(batch)
+        except (Rejected, TimeoutError, FutureTimeoutError) as e:
+            # The status line is already sent; report where to resume instead
+            logging.warning(f"API stream shed at line {batch[0][0]}: {e}")
+            yield json.dumps({"from_line": batch[0][0], "error": str(e)}) + "\n"
+            return
+        logging.info(f"API stream: {records} records, {errors} invalid lines, spellcheck={use_spellcheck}, "
+                     f"{time.perf_counter() - start:.2f}s")
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -61,23 +508,130 @@ def index():
         Rendered HTML page with results (if POST) or input form (if GET)
     """
     if request.method == "POST":
+        if STARTUP["state"] != "ready":
+            return _not_ready_response()
+        start = time.perf_counter()
         # Get user input from form
         text = request.form.get("text", "")
         use_spellcheck = request.form.get("spellcheck") == "on"
+        # Logged as JSON so spellcheck/build_correction_table.py can mine recurring typos
+        # (serialized on the log writer thread)
+        logging.info("Input text: %s", LazyJson(text))
+        INPUT_CHARS.observe(len(text))
 
-        # Optionally correct the text
-        corrected_text = correct_text(text) if use_spellcheck else text
-        # Extract entities from the (corrected) text
-        ents = extract_entities(corrected_text, nlp)
+        # Optionally correct the text and extract entities (cached per normalized text)
+        with ADMISSION.admit(g.deadline):
+            use_spellcheck = _effective_spellcheck(use_spellcheck)
+            corrected_text, ents = analyze_text(text, use_spellcheck, g.deadline)
+        analyzed = time.perf_counter()
 
         # Render the template with results
-        return render_template_string(TEMPLATE, original=text,
-                                      corrected=corrected_text if use_spellcheck else None,
-                                      entities=ents)
+        with STAGE_SECONDS.time(stage="render"):
+            page = render_template_string(TEMPLATE, original=text,
+                                          corrected=corrected_text if use_spellcheck else None,
+                                          entities=ents)
+        end = time.perf_counter()
+        STAGE_SECONDS.observe(end - start, stage="total")
+        g.log_fields = {"spellcheck": use_spellcheck, "timing_ms": {
+            "analyze": round((analyzed - start) * 1000, 2),
+            "render": round((end - analyzed) * 1000, 2),
+            "total": round((end - start) * 1000, 2),
+        }}
+        return page
 
     # Render the input form on GET
     return render_template_string(TEMPLATE)
 
+def _stat(resource, field):
+    """Gauge reader for a counter of a loaded resource's stats() (None until it is loaded)."""
+    def read():
+        return RESOURCES[resource].stats()[field] if RESOURCES[resource] is not None else None
+    return read
+
+Gauge("spell_cache_hit_ratio", "Hit ratio of the spell correction token cache.",
+      lambda: get_cache_stats()["hit_ratio"])
+Gauge("ner_result_cache_hit_ratio", "Hit ratio of the NER result cache.", _stat("ner_cache", "hit_ratio"))
+Gauge("ner_result_cache_bytes", "Approximate bytes held by the NER result cache.", _stat("ner_cache", "bytes"))
+Gauge("ner_microbatch_mean_size", "Mean batch size of the NER micro-batcher.", _stat("batcher", "mean_batch_size"))
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Expose latency histograms, input sizes, spell correction counters and cache ratios
+    in the Prometheus text format. Each gunicorn worker reports its own values.
+    Returns:
+        Prometheus text exposition
+    """
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/stats/spellcheck", methods=["GET"])
+def spellcheck_stats():
+    """
+    Report the spell correction cache counters so the cache can be sized.
+    Returns:
+        JSON object with size, maxsize, hits, misses, evictions and hit_ratio
+    """
+    return jsonify(get_cache_stats())
+
+@app.route("/stats/ner-cache", methods=["GET"])
+def ner_cache_stats():
+    """
+    Report the NER result cache counters (hit rate, memory in use, model version).
+    Returns:
+        JSON object with the cache counters, or 503 before the model is loaded
+    """
+    if RESOURCES["ner_cache"] is None:
+        return _not_ready_response()
+    return jsonify(RESOURCES["ner_cache"].stats())
+
+@app.route("/stats/microbatch", methods=["GET"])
+def microbatch_stats():
+    """
+    Report the micro-batcher's batch-size distribution and queueing delay.
+    Returns:
+        JSON object with the batcher counters, or 404 when NER_MICROBATCH is off
+    """
+    if RESOURCES["batcher"] is None:
+        return jsonify({"error": "Micro-batching is disabled"}), 404
+    return jsonify(RESOURCES["batcher"].stats())
+
+@app.route("/admin/profiles", methods=["GET"])
+def list_profiles():
+    """
+    List the stored request profiles of this worker's profile directory (requires X-Admin-Token).
+    Returns:
+        JSON list of profile ids, newest first; 403 without a valid token
+    """
+    if not PROFILER.authorised(request.headers):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(PROFILER.list())
+
+@app.route("/admin/profiles/<profile_id>", methods=["GET"])
+def show_profile(profile_id):
+    """
+    Return the text summary (top functions by cumulative time) of a stored profile (requires X-Admin-Token).
+    Returns:
+        Plain text summary; 403 without a valid token, 404 for an unknown id
+    """
+    if not PROFILER.authorised(request.headers):
+        return jsonify({"error": "Forbidden"}), 403
+    summary = PROFILER.summary(profile_id)
+    if summary is None:
+        return jsonify({"error": "Unknown profile"}), 404
+    return Response(summary, mimetype="text/plain")
+
+@app.route("/stats/memory", methods=["GET"])
+def memory_stats():
+    """
+    Report the memory of the process serving this request and of its parent (the gunicorn master).
+    Returns:
+        JSON object with rss, pss, uss, shared and swap in bytes per pid
+    """
+    return jsonify({
+        "worker": {"pid": os.getpid(), **process_memory()},
+        "parent": {"pid": os.getppid(), **process_memory(os.getppid())},
+    })
+
 # HTML template for the web interface
 TEMPLATE = """
 <!doctype html>
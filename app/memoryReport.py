@@ -0,0 +1,98 @@
+import os
+from typing import Dict, List, Optional
+
+# Fields of /proc/<pid>/smaps_rollup summed into each reported figure (values are in kB)
+_SMAPS_FIELDS = {
+    "rss": ("Rss",),
+    "pss": ("Pss",),
+    "uss": ("Private_Clean", "Private_Dirty"),
+    "shared": ("Shared_Clean", "Shared_Dirty"),
+    "swap": ("Swap",),
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """
+    Read resident, proportional, unique and shared memory of a process from /proc (Linux).
+
+    PSS splits every shared page evenly between the processes mapping it, so the
+    PSS of all workers sums to their real footprint; USS is what a process would
+    free on exit.
+
+    Args:
+        pid: Process id (default: the current process)
+
+    Returns:
+        Dict[str, int]: rss, pss, uss, shared and swap in bytes (empty if /proc is unavailable)
+    """
+    pid = os.getpid() if pid is None else pid
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    values[parts[0][:-1]] = int(parts[1]) * 1024
+    except OSError:
+        return {}
+    return {name: sum(values.get(field, 0) for field in fields) for name, fields in _SMAPS_FIELDS.items()}
+
+
+def child_pids(pid: int) -> List[int]:
+    """
+    Return the ids of the direct children of a process.
+
+    Args:
+        pid: Parent process id
+
+    Returns:
+        List[int]: Child process ids (empty if /proc is unavailable)
+    """
+    children = []
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return children
+
+
+def available_memory() -> Optional[int]:
+    """
+    Return the memory available to this container or host in bytes.
+
+    Uses the cgroup v2/v1 limit minus current usage when a limit is set, and
+    MemAvailable from /proc/meminfo otherwise.
+
+    Returns:
+        Optional[int]: Available bytes, or None if it cannot be determined
+    """
+    for limit_path, usage_path in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                                    "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        try:
+            with open(limit_path, "r") as f:
+                limit = f.read().strip()
+            with open(usage_path, "r") as f:
+                usage = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        # "max" (v2) or a huge sentinel (v1) means no limit
+        if limit.isdigit() and int(limit) < 1 << 60:
+            return max(0, int(limit) - usage)
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def available_cores() -> int:
+    """Number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
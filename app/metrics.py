@@ -0,0 +1,163 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from a cached token lookup to a long transformer pass
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Input size buckets (characters or tokens)
+SIZE_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_REGISTRY: List["_Metric"] = []
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time (e.g. a cache hit ratio)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        super().__init__(name, documentation)
+        self._read = read
+
+    def samples(self) -> Iterator[str]:
+        try:
+            value = self._read()
+        except Exception:
+            return
+        if value is not None:
+            yield f"{self.name} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets, optionally split by labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the with-block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in the Prometheus text exposition format (version 0.0.4).
+
+    Returns:
+        str: The exposition text
+    """
+    return "\n".join(metric.render() for metric in _REGISTRY) + "\n"
+
+
+# Request stages in app/main.py
+STAGE_SECONDS = Histogram("request_stage_seconds", "Latency of request stages (spellcheck, ner, render, total).",
+                          labelnames=("stage",))
+INPUT_CHARS = Histogram("request_input_chars", "Length of submitted texts in characters.", SIZE_BUCKETS)
+
+# Spell correction (app/spellCorrector.py)
+# Outcomes are counted on correction-cache misses only, keeping the per-token hot path untouched
+SPELL_TOKEN_LOOKUPS = Counter("spell_token_lookups_total",
+                              "Uncached token lookups by outcome: valid (in corpus or not a word), table, "
+                              "corrected or unresolved. OOV tokens are table + corrected + unresolved.",
+                              labelnames=("outcome",))
+SPELL_CORRECTED_TOKENS = Counter("spell_corrected_tokens_total", "Token occurrences replaced by a correction.")
+SPELL_SUGGESTION_CALLS = Counter("spell_suggestion_calls_total", "Calls into the fuzzy suggestion engine.")
+SPELL_SUGGESTION_SECONDS = Histogram("spell_suggestion_seconds", "Latency of one suggestion engine lookup.")
+SPELL_TEXT_TOKENS = Histogram("spell_text_tokens", "Whitespace tokens per corrected text.", SIZE_BUCKETS)
+
+# NER (app/ner.py)
+NER_PIPELINE_SECONDS = Histogram("ner_pipeline_seconds", "Latency of one spaCy pipeline call.",
+                                 labelnames=("mode",))
+NER_DOC_TOKENS = Histogram("ner_doc_tokens", "spaCy tokens per processed document.", SIZE_BUCKETS)
+NER_BATCH_SIZE = Histogram("ner_batch_size", "Documents per batched extraction call.", BATCH_BUCKETS)
@@ -0,0 +1,169 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MICROBATCH_MAX_SIZE = int(os.environ.get("NER_MICROBATCH_MAX_SIZE", 16))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("NER_MICROBATCH_MAX_WAIT_MS", 5))
+# Queueing delays kept for the percentiles in stats()
+DELAY_WINDOW = 1000
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-item calls into batches on a background thread.
+
+    Callers submit an item and wait on the returned Future. The worker takes the
+    first queued item, keeps draining the queue until it holds max_size items or
+    max_wait_ms has passed since that item arrived, runs process_batch once on
+    the whole batch and fulfils the futures in order. Items whose future was
+    cancelled or whose deadline has passed are dropped before the batch runs.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_size: int = MICROBATCH_MAX_SIZE,
+                 max_wait_ms: float = MICROBATCH_MAX_WAIT_MS, name: str = "microbatcher"):
+        self.process_batch = process_batch
+        self.max_size = max(1, max_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.batch_sizes: Counter = Counter()
+        self.delays: deque = deque(maxlen=DELAY_WINDOW)
+        self.items = 0
+        self.failures = 0
+        self.expired = 0
+
+    def _ensure_started(self) -> None:
+        """Start the worker thread, again after a fork (threads do not survive it)."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any, deadline: Optional[float] = None) -> Future:
+        """
+        Queue an item for the next batch.
+
+        Args:
+            item: The input to process
+            deadline: time.monotonic() value after which the item is dropped instead of processed
+
+        Returns:
+            Future: Resolves to the item's result (or raises the batch's exception, or
+            TimeoutError if the deadline passed before the item was batched)
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter(), deadline))
+        return future
+
+    def __call__(self, item: Any, deadline: Optional[float] = None) -> Any:
+        """
+        Submit an item and block until its result is ready.
+
+        Raises:
+            TimeoutError: If the deadline passes first (the builtin, also on Python < 3.11);
+            the item is then not processed
+        """
+        future = self.submit(item, deadline)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout=timeout)
+        except (TimeoutError, FutureTimeoutError):
+            # Too late for the caller: drop the item if it has not started yet.
+            # Before 3.11 futures raise their own TimeoutError, not the builtin
+            future.cancel()
+            raise TimeoutError("Deadline passed waiting for the micro-batch") from None
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first item, then drain until the batch is full or max_wait has passed."""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            collected = self._collect()
+            now = time.monotonic()
+            batch = []
+            for entry in collected:
+                _, future, _, deadline = entry
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if deadline is not None and deadline <= now:
+                    future.set_exception(TimeoutError("Deadline passed before the item was batched"))
+                    continue
+                batch.append(entry)
+            started = time.perf_counter()
+            with self._lock:
+                self.expired += len(collected) - len(batch)
+                if not batch:
+                    continue
+                self.batch_sizes[len(batch)] += 1
+                self.items += len(batch)
+                self.delays.extend(started - enqueued for _, _, enqueued, _ in batch)
+            try:
+                results = self.process_batch([item for item, _, _, _ in batch])
+                for (_, future, _, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(batch)} items failed: {e}")
+                with self._lock:
+                    self.failures += 1
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the batch-size distribution and queueing-delay statistics.
+
+        Returns:
+            Dict[str, Any]: max_size, max_wait_ms, batches, items, failures, expired, mean_batch_size,
+            batch_sizes (size -> count) and queue_delay_ms (mean, p50, p99, max over recent items)
+        """
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            delays = sorted(self.delays)
+            sizes = dict(sorted(self.batch_sizes.items()))
+            items, failures, expired = self.items, self.failures, self.expired
+
+        def percentile(q):
+            return delays[min(len(delays) - 1, int(q * len(delays)))] * 1000 if delays else 0.0
+
+        return {
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": batches,
+            "items": items,
+            "failures": failures,
+            "expired": expired,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "batch_sizes": sizes,
+            "queue_delay_ms": {
+                "mean": sum(delays) / len(delays) * 1000 if delays else 0.0,
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": delays[-1] * 1000 if delays else 0.0,
+            },
+        }
@@ -1,27 +1,166 @@
+import json
 import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 import spacy
+from spacy.tokens import Doc
+
+from metrics import NER_BATCH_SIZE, NER_DOC_TOKENS, NER_PIPELINE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+MODEL_PATH = os.environ.get("NER_MODEL_PATH", "models")
+DEFAULT_BATCH_SIZE = 16  # matches [nlp] batch_size in config.cfg
+# Padded-token budget per batch and sort buffer, as [training.batcher] (batch_by_padded) in config.cfg
+PADDED_TOKEN_BUDGET = int(os.environ.get("NER_PADDED_TOKENS", 2000))
+BUCKET_BUFFER = 256
+# Long-document mode: texts longer than NER_MAX_WINDOW tokens are split into overlapping windows
+MAX_WINDOW_TOKENS = int(os.environ.get("NER_MAX_WINDOW", 256))
+WINDOW_OVERLAP = int(os.environ.get("NER_WINDOW_OVERLAP", 32))
+if not 0 < WINDOW_OVERLAP < MAX_WINDOW_TOKENS:
+    # Fail at startup rather than on the first long request (see token_windows)
+    raise ValueError(f"NER_WINDOW_OVERLAP must be between 1 and NER_MAX_WINDOW - 1, got {WINDOW_OVERLAP}")
+# Windows processed together; caps peak memory per request
+MAX_WINDOWS_PER_BATCH = int(os.environ.get("NER_MAX_WINDOWS_PER_BATCH", 8))
+# Cascade mode: a small tok2vec NER pipeline answers first, the transformer only below this confidence
+FAST_MODEL_PATH = os.environ.get("NER_FAST_MODEL_PATH", "models_fast")
+CASCADE_THRESHOLD = float(os.environ.get("NER_CASCADE_THRESHOLD", 0.9))
+CASCADE_BEAM_WIDTH = 8
+# Components inference needs; everything else in the saved pipeline is excluded at load time
+INFERENCE_COMPONENTS = [c.strip() for c in os.environ.get("NER_COMPONENTS", "transformer,ner").split(",") if c.strip()]
+# Components to load but keep disabled (e.g. to enable per request later)
+DISABLED_COMPONENTS = [c.strip() for c in os.environ.get("NER_DISABLE", "").split(",") if c.strip()]
+
+def inference_load_options(model_path: str = MODEL_PATH) -> Dict[str, List[str]]:
+    """
+    Derive spacy.load exclude/disable lists from the saved pipeline config.
+    
+    Args:
+        model_path: Directory of the saved pipeline
+    
+    Returns:
+        Dict[str, List[str]]: "exclude" (components not needed for inference) and
+        "disable" (components loaded but switched off)
+    """
+    config = spacy.util.load_config(Path(model_path) / "config.cfg", interpolate=False)
+    pipeline = list(config["nlp"]["pipeline"])
+    exclude = [name for name in pipeline if name not in INFERENCE_COMPONENTS]
+    disable = [name for name in pipeline
+               if name not in exclude and (name in DISABLED_COMPONENTS or name in config["nlp"].get("disabled", []))]
+    missing = [name for name in INFERENCE_COMPONENTS if name not in pipeline]
+    if missing:
+        logger.warning(f"Inference components not in the saved pipeline: {missing}")
+    return {"exclude": exclude, "disable": disable}
+
+# Post-training dynamic int8 quantization of the transformer's Linear layers (see training/quantize_pipeline.py).
+# "auto" follows the quantization.json marker of the model directory; "1"/"0" force it on/off.
+QUANTIZE = os.environ.get("NER_QUANTIZE", "auto")
+QUANTIZATION_FILE = "quantization.json"
+
+def transformer_shims(nlp):
+    """Yield the thinc shims wrapping PyTorch models in the pipeline (shim._model holds the transformer weights)."""
+    import torch
+
+    for _, proc in nlp.pipeline:
+        model = getattr(proc, "model", None)
+        if model is None or not hasattr(model, "walk"):
+            continue
+        for node in model.walk():
+            for shim in getattr(node, "shims", []):
+                if isinstance(getattr(shim, "_model", None), torch.nn.Module):
+                    yield shim
+
+def quantize_transformer(nlp) -> int:
+    """
+    Apply dynamic int8 quantization to the Linear layers of the pipeline's PyTorch models, in place.
+    
+    Weights are stored as int8 and activations are quantized on the fly, which
+    cuts transformer weight memory roughly by four and speeds up CPU inference.
+    
+    Args:
+        nlp: A loaded pipeline with a transformer component
+    
+    Returns:
+        int: Number of PyTorch models quantized
+    """
+    import torch
+
+    shims = list(transformer_shims(nlp))
+    for shim in shims:
+        shim._model = torch.quantization.quantize_dynamic(shim._model, {torch.nn.Linear}, dtype=torch.qint8)
+    logger.info(f"Quantized {len(shims)} PyTorch model(s) to dynamic int8")
+    return len(shims)
+
+def _wants_quantization(model_path: str, quantize: Optional[bool]) -> bool:
+    """Resolve the quantize option of load_model against NER_QUANTIZE and the model's marker file."""
+    if quantize is not None:
+        return quantize
+    if QUANTIZE in ("0", "1"):
+        return QUANTIZE == "1"
+    marker = Path(model_path) / QUANTIZATION_FILE
+    if not marker.exists():
+        return False
+    with open(marker, "r", encoding="utf-8") as f:
+        return json.load(f).get("dtype") == "qint8"
+
 # Load SpaCy English model from the specified directory
 
-def load_model():
+def load_model(model_path: str = MODEL_PATH, exclude: Optional[List[str]] = None,
+               disable: Optional[List[str]] = None, quantize: Optional[bool] = None):
     """
     Load the trained SpaCy model from the 'models' directory.
     
+    Only the components inference needs are loaded: unless given explicitly,
+    exclude and disable are derived from the saved config (see inference_load_options).
+    
+    Args:
+        model_path: Directory of the saved pipeline (default: NER_MODEL_PATH or 'models')
+        exclude: Components not to load at all
+        disable: Components to load but disable
+        quantize: Apply dynamic int8 quantization to the transformer (default: NER_QUANTIZE,
+            or the model directory's quantization.json marker)
+    
     Returns:
         nlp: The loaded SpaCy language model
     Raises:
         Exception: If the model cannot be loaded
     """
     try:
-        nlp = spacy.load("models")  # Load the model from the 'models' directory
-        logger.info("SpaCy model loaded successfully")
+        if exclude is None or disable is None:
+            options = inference_load_options(model_path)
+            exclude = options["exclude"] if exclude is None else exclude
+            disable = options["disable"] if disable is None else disable
+        nlp = spacy.load(model_path, exclude=exclude, disable=disable)  # Load the model from the 'models' directory
+        if _wants_quantization(model_path, quantize):
+            quantize_transformer(nlp)
+        install_error_handlers(nlp)
+        logger.info(f"SpaCy model loaded successfully with pipeline {nlp.pipe_names} (excluded: {exclude})")
         return nlp
     except Exception as e:
         logger.error(f"Error loading SpaCy model: {e}")
         raise
 
+def load_fast_model(model_path: str = FAST_MODEL_PATH):
+    """
+    Load the small NER pipeline used as the first tier of the cascade.
+    
+    Unlike load_model, all of its components are kept (its ner listens to its own tok2vec).
+    
+    Args:
+        model_path: Directory of the saved pipeline (default: NER_FAST_MODEL_PATH or 'models_fast')
+    
+    Returns:
+        nlp: The loaded SpaCy language model
+    """
+    return load_model(model_path, exclude=[], disable=[], quantize=False)
+
+def _doc_entities(doc) -> List[dict]:
+    """Return the entities of a processed Doc with their text, label and char offsets."""
+    return [{"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+            for ent in doc.ents]
+
 def extract_entities(text: str, nlp):
     """
     Extract named entities from the input text using the provided SpaCy model.
@@ -31,12 +170,336 @@ def extract_entities(text: str, nlp):
         nlp: The loaded SpaCy language model
     
     Returns:
-        List[dict]: A list of dictionaries, each containing the entity text and label
+        List[dict]: A list of dictionaries, each containing the entity text, label
+        and start/end character offsets
     """
     try:
+        start = time.perf_counter()
         doc = nlp(text)  # Process the text with the SpaCy model
-        # Return a list of entities with their text and label
-        return [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
+        NER_PIPELINE_SECONDS.observe(time.perf_counter() - start, mode="single")
+        NER_DOC_TOKENS.observe(len(doc))
+        # Return a list of entities with their text, label and offsets
+        return _doc_entities(doc)
     except Exception as e:
         logger.error(f"Error extracting entities: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def _skip_failed_batch(proc_name, proc, docs, e):
+    """Pipeline error handler that logs a failed batch instead of aborting nlp.pipe."""
+    logger.error(f"Component '{proc_name}' failed on a batch of {len(docs)} documents: {e}")
+
+def install_error_handlers(nlp) -> None:
+    """
+    Make every component log and drop a failed batch instead of raising (see extract_entities_batch).
+
+    Installed once and never restored: the pipeline is shared by request threads and
+    the micro-batcher, so swapping handlers around each call would race. Components
+    whose handler cannot be replaced (the Cython ner/parser of spaCy 3.7 and 3.8 have
+    no error_handler attribute) keep raising; extract_entities_batch then retries
+    the rest of the stream one document at a time.
+    """
+    for _, proc in nlp.pipeline:
+        if not hasattr(proc, "set_error_handler") or proc.get_error_handler() is _skip_failed_batch:
+            continue
+        try:
+            proc.set_error_handler(_skip_failed_batch)
+        except AttributeError:
+            pass
+
+def extract_entities_batch(texts: Iterable[str], nlp, batch_size: int = DEFAULT_BATCH_SIZE,
+                           n_process: int = 1) -> List[List[dict]]:
+    """
+    Extract named entities from many texts with nlp.pipe.
+
+    Documents are batched through the transformer together. If a component fails
+    on a batch, the documents nlp.pipe did not return (that batch, or the rest of
+    the stream when the component raises) are retried one by one, so a bad
+    document only loses its own entities.
+
+    Args:
+        texts: The input texts (or already tokenized Docs) to analyze
+        nlp: The loaded SpaCy language model
+        batch_size: Number of documents per nlp.pipe batch
+        n_process: Number of processes nlp.pipe may use
+
+    Returns:
+        List[List[dict]]: Per input text, the entities as returned by extract_entities
+    """
+    texts = list(texts)
+    results = [[] for _ in texts]
+    pending = [(text, i) for i, text in enumerate(texts)
+               if isinstance(text, Doc) or (isinstance(text, str) and text)]
+
+    # Failed batches are dropped from the stream instead of raising where the component
+    # allows it; retried below (a no-op for pipelines from load_model, which installs the handlers)
+    install_error_handlers(nlp)
+    done = set()
+    start = time.perf_counter()
+    try:
+        for doc, i in nlp.pipe(pending, as_tuples=True, batch_size=batch_size, n_process=n_process):
+            results[i] = _doc_entities(doc)
+            NER_DOC_TOKENS.observe(len(doc))
+            done.add(i)
+    except Exception as e:
+        logger.error(f"Error in batched entity extraction: {e}")
+    if pending:
+        NER_PIPELINE_SECONDS.observe(time.perf_counter() - start, mode="batch")
+        NER_BATCH_SIZE.observe(len(pending))
+
+    for text, i in pending:
+        if i not in done:
+            results[i] = extract_entities(text, nlp)
+    return results
+
+def length_buckets(lengths: List[int], max_padded_tokens: int = PADDED_TOKEN_BUDGET,
+                   buffer: int = BUCKET_BUFFER) -> List[List[int]]:
+    """
+    Group document indices into batches of similar length under a padded-token budget.
+    
+    Like spaCy's batch_by_padded: indices are read in windows of buffer items,
+    sorted by length inside each window, and cut into batches whose
+    size * longest length stays within max_padded_tokens. A document longer
+    than the budget gets a batch of its own.
+    
+    Args:
+        lengths: Token length of each document
+        max_padded_tokens: Maximum padded tokens (batch size * longest document) per batch
+        buffer: Number of documents sorted together
+    
+    Returns:
+        List[List[int]]: Batches of indices into lengths
+    """
+    batches = []
+    for start in range(0, len(lengths), max(1, buffer)):
+        window = sorted(range(start, min(start + buffer, len(lengths))), key=lengths.__getitem__)
+        batch, longest = [], 0
+        for i in window:
+            padded_longest = max(longest, lengths[i])
+            if batch and padded_longest * (len(batch) + 1) > max_padded_tokens:
+                batches.append(batch)
+                batch, padded_longest = [], lengths[i]
+            batch.append(i)
+            longest = padded_longest
+        if batch:
+            batches.append(batch)
+    return batches
+
+def extract_entities_bucketed(texts: Iterable[str], nlp, max_padded_tokens: int = PADDED_TOKEN_BUDGET,
+                              buffer: int = BUCKET_BUFFER) -> List[List[dict]]:
+    """
+    Extract named entities from many texts, batching documents of similar length together.
+    
+    Texts are tokenized once, grouped with length_buckets so short titles are
+    not padded up to long descriptions, run batch by batch, and returned in
+    input order. Token counts stand in for the transformer's wordpiece lengths.
+    
+    Args:
+        texts: The input texts (or already tokenized Docs) to analyze
+        nlp: The loaded SpaCy language model
+        max_padded_tokens: Maximum padded tokens per batch
+        buffer: Number of documents sorted together
+    
+    Returns:
+        List[List[dict]]: Per input text, the entities as returned by extract_entities
+    """
+    texts = list(texts)
+    results = [[] for _ in texts]
+    docs = {i: text if isinstance(text, Doc) else nlp.make_doc(text)
+            for i, text in enumerate(texts) if isinstance(text, Doc) or (isinstance(text, str) and text)}
+    indices = list(docs)
+    for batch in length_buckets([len(docs[i]) for i in indices], max_padded_tokens, buffer):
+        batch_indices = [indices[j] for j in batch]
+        batch_results = extract_entities_batch([docs[i] for i in batch_indices], nlp, batch_size=len(batch))
+        for i, ents in zip(batch_indices, batch_results):
+            results[i] = ents
+    return results
+
+def token_windows(n_tokens: int, window: int = MAX_WINDOW_TOKENS,
+                  overlap: int = WINDOW_OVERLAP) -> List[Tuple[int, int]]:
+    """
+    Split a token range into windows of at most window tokens that overlap by overlap tokens.
+    
+    Args:
+        n_tokens: Number of tokens in the document
+        window: Maximum tokens per window
+        overlap: Tokens shared by consecutive windows, at least 1 and smaller than window.
+            Without an overlap an entity across a window edge would be split in two.
+            Entities longer than the overlap can still be cut when they cross a window edge
+    
+    Returns:
+        List[Tuple[int, int]]: (start, end) token offsets of each window, end exclusive
+    Raises:
+        ValueError: If overlap is outside [1, window)
+    """
+    if not 0 < overlap < window:
+        raise ValueError(f"Window overlap must be between 1 and {window - 1} tokens, got {overlap}")
+    step = window - overlap
+    windows = []
+    start = 0
+    while True:
+        end = min(start + window, n_tokens)
+        windows.append((start, end))
+        if end >= n_tokens:
+            return windows
+        start += step
+
+def _stitch_window_entities(text: str, window_ents: List[Tuple[int, int, int, int, List[dict]]]) -> List[dict]:
+    """
+    Merge per-window entities into one non-overlapping list in original-text offsets.
+    
+    Each window owns the characters up to the middle of its overlap with the next
+    one. An entity touching an interior window edge may be cut there, so it is
+    dropped when the neighbouring window across that edge sees it with context on
+    that side (i.e. not touching its own edge); otherwise neither window can tell
+    more and it is kept. Remaining conflicts keep owned, then longer spans.
+    
+    Args:
+        text: The original text
+        window_ents: Per window (char start, char end, owned start, owned end, entities
+            with offsets relative to the window)
+    
+    Returns:
+        List[dict]: Entities sorted by start offset
+    """
+    candidates = []
+    last = len(window_ents) - 1
+    for k, (char_start, char_end, owned_start, owned_end, ents) in enumerate(window_ents):
+        for ent in ents:
+            start, end = ent["start"] + char_start, ent["end"] + char_start
+            # The previous window ends later than this one starts, the next starts earlier than this one ends
+            if k > 0 and start == char_start and end < window_ents[k - 1][1]:
+                continue
+            if k < last and end == char_end and start > window_ents[k + 1][0]:
+                continue
+            owned = owned_start <= start < owned_end
+            candidates.append((not owned, -(end - start), start, end, ent["label"]))
+
+    kept = []
+    taken = set()
+    for _, _, start, end, label in sorted(set(candidates)):
+        if any(start < other_end and other_start < end for other_start, other_end in taken):
+            continue
+        taken.add((start, end))
+        kept.append({"text": text[start:end], "label": label, "start": start, "end": end})
+    return sorted(kept, key=lambda ent: ent["start"])
+
+def extract_entities_windowed(text: str, nlp, window: int = MAX_WINDOW_TOKENS, overlap: int = WINDOW_OVERLAP,
+                              windows_per_batch: int = MAX_WINDOWS_PER_BATCH) -> List[dict]:
+    """
+    Extract named entities from arbitrarily long text in overlapping token windows.
+    
+    Texts of at most window tokens go straight to extract_entities. Longer texts
+    are cut into windows (see token_windows), run through nlp.pipe at most
+    windows_per_batch at a time, and the entities are stitched back into
+    original-text character offsets with duplicates from the overlaps removed.
+    
+    Args:
+        text (str): The input text to analyze
+        nlp: The loaded SpaCy language model
+        window: Maximum tokens per window
+        overlap: Tokens shared by consecutive windows
+        windows_per_batch: Windows processed together; bounds peak memory per request
+    
+    Returns:
+        List[dict]: The entities, as returned by extract_entities
+    """
+    if not isinstance(text, str) or not text:
+        return []
+    doc = nlp.make_doc(text)
+    if len(doc) <= window:
+        return extract_entities(text, nlp)
+
+    spans = token_windows(len(doc), window, overlap)
+    bounds = []
+    for k, (start, end) in enumerate(spans):
+        char_start = doc[start].idx
+        char_end = doc[end - 1].idx + len(doc[end - 1])
+        # Ownership switches halfway through the overlap with the neighbouring window
+        owned_start = doc[(start + spans[k - 1][1]) // 2].idx if k > 0 else 0
+        owned_end = doc[(spans[k + 1][0] + end) // 2].idx if k + 1 < len(spans) else len(text)
+        bounds.append((char_start, char_end, owned_start, owned_end))
+
+    window_ents = []
+    batch_size = max(1, windows_per_batch)
+    for i in range(0, len(bounds), batch_size):
+        chunk = bounds[i:i + batch_size]
+        chunk_ents = extract_entities_batch([text[b[0]:b[1]] for b in chunk], nlp, batch_size=batch_size)
+        window_ents.extend(b + (ents,) for b, ents in zip(chunk, chunk_ents))
+    logger.info(f"Extracted entities from {len(doc)} tokens in {len(spans)} windows")
+    return _stitch_window_entities(text, window_ents)
+
+def annotate_with_confidence(texts: List[str], nlp, beam_width: int = CASCADE_BEAM_WIDTH,
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> List[Tuple[Doc, float]]:
+    """
+    Run a pipeline's NER and score how sure it is about each document.
+    
+    The components before "ner" run as usual; "ner" then parses each batch once
+    with a beam (for entity probabilities) and once greedily (for the entities).
+    A document's confidence is the lowest beam probability among its predicted
+    entities or, when it has none, one minus the highest probability of any
+    entity the beam considered.
+    
+    Args:
+        texts: The input texts to analyze
+        nlp: A pipeline with a "ner" component
+        beam_width: Number of parses kept by the beam
+        batch_size: Number of documents per batch
+    
+    Returns:
+        List[Tuple[Doc, float]]: The annotated doc and its confidence in [0, 1] per text
+    """
+    ner = nlp.get_pipe("ner")
+    annotated = []
+    for start in range(0, len(texts), batch_size):
+        docs = [nlp.make_doc(text) for text in texts[start:start + batch_size]]
+        for name, proc in nlp.pipeline:
+            if name == "ner":
+                break
+            docs = list(proc.pipe(docs, batch_size=batch_size))
+        all_scores = ner.scored_ents(ner.beam_parse(docs, beam_width=beam_width))
+        ner.set_annotations(docs, ner.predict(docs))
+        for doc, scores in zip(docs, all_scores):
+            predicted = [(ent.start, ent.end, ent.label_) for ent in doc.ents]
+            if predicted:
+                confidence = min(scores.get(key, 0.0) for key in predicted)
+            else:
+                confidence = 1.0 - max(scores.values(), default=0.0)
+            annotated.append((doc, confidence))
+    return annotated
+
+def extract_entities_cascade(texts: Iterable[str], fast_nlp, nlp, threshold: float = CASCADE_THRESHOLD,
+                             batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[List[List[dict]], List[bool]]:
+    """
+    Extract named entities with a fast pipeline first and escalate uncertain documents.
+    
+    Every text is run through fast_nlp; documents whose annotate_with_confidence
+    score is below threshold are re-run through the full transformer pipeline.
+    
+    Args:
+        texts: The input texts to analyze
+        fast_nlp: A small (tok2vec) NER pipeline
+        nlp: The full ["transformer","ner"] pipeline
+        threshold: Confidence below which a document is escalated (0 never, above 1 always)
+        batch_size: Number of documents per nlp.pipe batch
+    
+    Returns:
+        Tuple[List[List[dict]], List[bool]]: Per input text, the entities and whether it was escalated
+    """
+    texts = list(texts)
+    results = [[] for _ in texts]
+    escalated = [False] * len(texts)
+    pending = [i for i, text in enumerate(texts) if isinstance(text, str) and text]
+    try:
+        annotated = annotate_with_confidence([texts[i] for i in pending], fast_nlp, batch_size=batch_size)
+        for i, (doc, confidence) in zip(pending, annotated):
+            results[i] = _doc_entities(doc)
+            escalated[i] = confidence < threshold
+    except Exception as e:
+        logger.error(f"Error in fast entity extraction, escalating all documents: {e}")
+        for i in pending:
+            escalated[i] = True
+
+    uncertain = [i for i, flag in enumerate(escalated) if flag]
+    for i, ents in zip(uncertain, extract_entities_batch([texts[i] for i in uncertain], nlp, batch_size)):
+        results[i] = ents
+    return results, escalated
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lruCache import ByteLRUCache
+
+logger = logging.getLogger(__name__)
+
+NER_CACHE_BYTES = int(os.environ.get("NER_CACHE_BYTES", 64 * 1024 * 1024))
+NER_CACHE_TTL = float(os.environ.get("NER_CACHE_TTL", 0))  # seconds; 0 disables expiry
+# How often (seconds) the model directory is re-checked for changes
+NER_CACHE_CHECK_INTERVAL = float(os.environ.get("NER_CACHE_CHECK_INTERVAL", 30))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text before it is cached and analysed: Unicode NFC, whitespace
+    runs collapsed to one space, leading/trailing whitespace stripped.
+
+    Args:
+        text: The raw input text
+
+    Returns:
+        str: The normalized text
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def model_version(model_path: str) -> str:
+    """
+    Fingerprint a saved pipeline directory.
+
+    Combines the name and version from meta.json with the relative path, size
+    and modification time of every file, so retraining or replacing the model
+    changes the fingerprint without hashing the weights.
+
+    Args:
+        model_path: Directory of the saved pipeline
+
+    Returns:
+        str: A short hex fingerprint ("missing" if the directory does not exist)
+    """
+    if not os.path.isdir(model_path):
+        return "missing"
+    digest = hashlib.sha1()
+    try:
+        with open(os.path.join(model_path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        digest.update(f"{meta.get('name')}-{meta.get('version')}".encode("utf-8"))
+    except (OSError, json.JSONDecodeError):
+        pass
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{os.path.relpath(path, model_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class NerResultCache:
+    """
+    Cache of (corrected text, entities) results keyed on a hash of the normalized
+    input text, the spellcheck flag and the model version.
+
+    Entries are bounded by a byte budget (LRU) and an optional TTL. The model
+    directory is re-fingerprinted at most every check_interval seconds; when it
+    changes, every entry is dropped.
+    """
+
+    def __init__(self, model_path: str, max_bytes: int = NER_CACHE_BYTES,
+                 ttl: Optional[float] = NER_CACHE_TTL, check_interval: float = NER_CACHE_CHECK_INTERVAL):
+        self.model_path = model_path
+        self.check_interval = check_interval
+        self.cache = ByteLRUCache(max_bytes=max_bytes, ttl=ttl)
+        self.version = model_version(model_path)
+        self.invalidations = 0
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _check_model(self) -> None:
+        """Drop all entries if the model directory changed since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            version = model_version(self.model_path)
+            if version != self.version:
+                logger.warning(f"Model directory {self.model_path} changed ({self.version} -> {version}); "
+                               f"clearing the NER result cache")
+                self.version = version
+                self.cache.clear()
+                self.invalidations += 1
+
+    def key(self, normalized_text: str, spellcheck: bool) -> str:
+        """
+        Build the cache key for a normalized text.
+
+        Args:
+            normalized_text: Output of normalize_text
+            spellcheck: Whether spell correction is applied before extraction
+
+        Returns:
+            str: Hex digest of the text, flag and model version
+        """
+        payload = f"{self.version}\x00{int(bool(spellcheck))}\x00{normalized_text}"
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def lookup(self, normalized_text: str, spellcheck: bool) -> Any:
+        """
+        Return the cached result for a text.
+
+        Args:
+            normalized_text: Output of normalize_text
+            spellcheck: Whether spell correction is applied before extraction
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        self._check_model()
+        return self.cache.get(self.key(normalized_text, spellcheck))
+
+    def store(self, normalized_text: str, spellcheck: bool, result: Any) -> None:
+        """
+        Cache the result for a text.
+
+        Args:
+            normalized_text: Output of normalize_text
+            spellcheck: Whether spell correction is applied before extraction
+            result: The value to cache
+        """
+        self.cache.put(self.key(normalized_text, spellcheck), result)
+
+    def get_or_compute(self, normalized_text: str, spellcheck: bool,
+                       compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Return the cached result for a text, computing and storing it on a miss.
+
+        Args:
+            normalized_text: Output of normalize_text
+            spellcheck: Whether spell correction is applied before extraction
+            compute: Called with no arguments on a miss to produce the result
+
+        Returns:
+            Tuple[Any, bool]: The result and whether it came from the cache
+        """
+        result = self.lookup(normalized_text, spellcheck)
+        if result is not None:
+            return result, True
+        result = compute()
+        self.store(normalized_text, spellcheck, result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters together with the model version.
+
+        Returns:
+            Dict[str, Any]: ByteLRUCache.stats() plus model_version and invalidations
+        """
+        stats = self.cache.stats()
+        stats["model_version"] = self.version
+        stats["invalidations"] = self.invalidations
+        return stats
@@ -0,0 +1,139 @@
+import bisect
+import logging
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Set
+
+from editDistance import bounded_distance, rank_candidates
+
+logger = logging.getLogger(__name__)
+
+GRAM_SIZE = 3
+PAD = "$"
+# A substitution, insertion or deletion touches at most GRAM_SIZE trigrams; an
+# adjacent transposition touches one more
+GRAMS_PER_EDIT = GRAM_SIZE + 1
+
+
+def _grams(word: str) -> Set[str]:
+    """
+    Return the distinct character trigrams of a word padded with boundary markers.
+
+    Args:
+        word: The word to split
+
+    Returns:
+        Set[str]: The padded trigrams
+    """
+    padded = PAD + word + PAD
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+class NgramIndex:
+    """
+    Character-trigram inverted index over a word list.
+
+    Words are numbered in order of length so each posting list (an array of
+    word ids) is also sorted by length, and a length window becomes a bisect
+    range. Candidates must share enough trigrams with the query to be within
+    max_distance edits, and always at least one, before they are verified with
+    the banded edit distance; short words that share no trigram with the query
+    are therefore never suggested. Storage is one flat word list, a length
+    offset table and an unsigned int array per trigram, which is far smaller
+    than a delete index over the same vocabulary.
+    """
+
+    def __init__(self, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.corpus_size = 0
+        self._words: List[str] = []
+        # _length_starts[k] is the first word id whose word is at least k characters long
+        self._length_starts: List[int] = [0]
+        self._postings: Dict[str, array] = {}
+
+    @classmethod
+    def build(cls, words: Iterable[str], max_distance: int = 2) -> "NgramIndex":
+        """
+        Build an index from an iterable of lowercase words.
+
+        Args:
+            words: The corpus words
+            max_distance: Maximum edit distance supported by lookups
+
+        Returns:
+            NgramIndex: The populated index
+        """
+        index = cls(max_distance)
+        index._words = sorted(words, key=lambda w: (len(w), w))
+        index.corpus_size = len(index._words)
+
+        longest = len(index._words[-1]) if index._words else 0
+        lengths = [len(w) for w in index._words]
+        index._length_starts = [bisect.bisect_left(lengths, k) for k in range(longest + 2)]
+
+        postings = index._postings
+        for word_id, word in enumerate(index._words):
+            for gram in _grams(word):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(word_id)
+        logger.info(f"Built trigram index over {index.corpus_size} words with {len(postings)} grams")
+        return index
+
+    def _id_range(self, min_length: int, max_length: int):
+        """Return the [first, last) word id range covering the given word lengths."""
+        starts = self._length_starts
+        lo = starts[min(max(min_length, 0), len(starts) - 1)]
+        hi = starts[min(max_length + 1, len(starts) - 1)]
+        return lo, hi
+
+    def candidates(self, word: str) -> Dict[str, int]:
+        """
+        Find every indexed word within max_distance edits of word.
+
+        Args:
+            word: The lowercase word to look up
+
+        Returns:
+            Dict[str, int]: Candidate words mapped to their edit distance
+        """
+        max_distance = self.max_distance
+        lo, hi = self._id_range(len(word) - max_distance, len(word) + max_distance)
+        if lo >= hi:
+            return {}
+
+        query_grams = _grams(word)
+        shared = Counter()
+        for gram in query_grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            start = bisect.bisect_left(posting, lo)
+            end = bisect.bisect_left(posting, hi, start)
+            shared.update(posting[start:end])
+
+        min_shared = max(1, len(query_grams) - GRAMS_PER_EDIT * max_distance)
+        found: Dict[str, int] = {}
+        for word_id, count in shared.items():
+            if count < min_shared:
+                continue
+            candidate = self._words[word_id]
+            distance = bounded_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                found[candidate] = distance
+        return found
+
+    def lookup(self, word: str, n: int = 1, cutoff: float = 0.6) -> List[str]:
+        """
+        Return the best corrections for word, closest first.
+
+        Args:
+            word: The lowercase word to look up
+            n: Maximum number of suggestions to return
+            cutoff: Minimum difflib similarity ratio for a suggestion
+
+        Returns:
+            List[str]: Up to n suggestions
+        """
+        return rank_candidates(word, self.candidates(word), n, cutoff)
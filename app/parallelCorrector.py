@@ -0,0 +1,150 @@
+import argparse
+import csv
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+from spellCorrector import correct_texts, load_corpus, load_language_model
+from spellEngines import CONFIGURED_ENGINE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _init_worker(corpus_path: str, index_path: Optional[str], engine: Optional[str],
+                 lm_path: Optional[str]) -> None:
+    """
+    Load the spell resources once per worker process.
+
+    Args:
+        corpus_path: Corpus passed to load_corpus
+        index_path: Optional prebuilt engine index
+        engine: Optional correction engine name
+        lm_path: Optional language model path
+    """
+    load_corpus(corpus_path, index_path=index_path, engine=engine)
+    if lm_path:
+        load_language_model(lm_path)
+    logger.info(f"Spell correction worker {os.getpid()} ready")
+
+
+def _correct_chunk(texts: List[str]) -> List[str]:
+    """Correct one chunk of texts inside a worker process."""
+    return list(correct_texts(texts, batch_size=len(texts)))
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def correct_texts_parallel(texts: Iterable[str], workers: Optional[int] = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE, max_in_flight: Optional[int] = None,
+                           corpus_path: str = "app/customCorpus.vocab", index_path: Optional[str] = None,
+                           engine: Optional[str] = None, lm_path: Optional[str] = None) -> Iterator[str]:
+    """
+    Correct texts across a pool of worker processes, yielding results in input order.
+
+    Input is consumed lazily in chunks; at most max_in_flight chunks are queued
+    or running at any time, so memory stays bounded for arbitrarily long inputs.
+    Each worker loads the corpus, engine and language model once in its
+    initializer.
+
+    Args:
+        texts: The texts to correct
+        workers: Number of worker processes (default: os.cpu_count())
+        chunk_size: Texts sent to a worker per task
+        max_in_flight: Maximum chunks submitted but not yet yielded (default: 2 * workers)
+        corpus_path: Corpus loaded by each worker
+        index_path: Optional prebuilt engine index loaded by each worker
+        engine: Optional correction engine name
+        lm_path: Optional language model loaded by each worker
+
+    Yields:
+        str: The corrected texts, identical to correct_text on each input
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    chunk_size = max(1, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(corpus_path, index_path, engine, lm_path)) as pool:
+        pending = deque()
+        for chunk in _chunks(texts, chunk_size):
+            pending.append(pool.submit(_correct_chunk, chunk))
+            while len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def correct_csv(csv_path: str, out_path: str, column: str = "article", **kwargs) -> int:
+    """
+    Stream a CSV through the parallel corrector, adding a corrected_<column> column.
+
+    The original column is kept untouched so that entity offsets stay valid.
+
+    Args:
+        csv_path: Input CSV file
+        out_path: Output CSV file
+        column: Name of the text column to correct
+        **kwargs: Passed to correct_texts_parallel
+
+    Returns:
+        int: Number of rows written
+    """
+    with open(csv_path, newline="", encoding="utf-8") as fin, \
+            open(out_path, "w", newline="", encoding="utf-8") as fout:
+        reader = csv.DictReader(fin)
+        writer = csv.DictWriter(fout, fieldnames=list(reader.fieldnames) + [f"corrected_{column}"])
+        writer.writeheader()
+        rows = deque()
+
+        def texts():
+            for row in reader:
+                rows.append(row)
+                yield row[column]
+
+        count = 0
+        for corrected in correct_texts_parallel(texts(), **kwargs):
+            row = rows.popleft()
+            row[f"corrected_{column}"] = corrected
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spell-correct a CSV column using multiple processes.")
+    parser.add_argument('--csv', type=str, default='output/spacy_training_data.csv', help='Input CSV file')
+    parser.add_argument('--out', type=str, default='output/spacy_training_data_corrected.csv', help='Output CSV file')
+    parser.add_argument('--column', type=str, default='article', help='Text column to correct')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk_size', type=int, default=DEFAULT_CHUNK_SIZE, help='Texts per worker task')
+    parser.add_argument('--corpus', type=str, default='app/customCorpus.vocab', help='Spell corpus')
+    # Without a prebuilt index every worker process rebuilds it (seconds of CPU and hundreds of MB each)
+    default_index = 'app/customCorpus.index' if os.path.exists('app/customCorpus.index') else None
+    parser.add_argument('--index', type=str, default=default_index,
+                        help='Prebuilt engine index (default: app/customCorpus.index if it exists)')
+    parser.add_argument('--engine', type=str, default=None, help='Correction engine name')
+    parser.add_argument('--lm', type=str, default=None, help='Optional language model')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Without an index and an explicit engine, workers fall back to the ngram engine (see default_engine)
+    if args.index is None and (args.engine or CONFIGURED_ENGINE) == "delete":
+        logger.warning("No prebuilt index; every worker builds its own. "
+                       "Build one with: python app/deleteIndex.py --out app/customCorpus.index")
+    start = time.perf_counter()
+    written = correct_csv(args.csv, args.out, args.column, workers=args.workers, chunk_size=args.chunk_size,
+                          corpus_path=args.corpus, index_path=args.index, engine=args.engine, lm_path=args.lm)
+    print(f"Corrected {written} rows in {time.perf_counter() - start:.1f}s -> {args.out}")
@@ -0,0 +1,169 @@
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from typing import List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "logs/profiles")
+# Number of profiles kept on disk; the oldest are deleted first
+PROFILE_RING_SIZE = int(os.environ.get("PROFILE_RING_SIZE", 50))
+# Fraction of requests profiled without being asked (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+# Requests carrying "X-Profile: 1" and this token in "X-Admin-Token" are profiled; unset disables the flag
+PROFILE_ADMIN_TOKEN = os.environ.get("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SUMMARY_LINES = 40
+
+
+class RequestProfiler:
+    """
+    Opt-in cProfile capture of single requests into a bounded ring of files.
+
+    cProfile only sees the calling thread and only one profiler can run at a
+    time, so at most one request is profiled at once; others run unprofiled.
+    Each profile is written as a .prof file (load with pstats or snakeviz) and a
+    .txt summary of the top functions by cumulative time.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, ring_size: int = PROFILE_RING_SIZE,
+                 sample_rate: float = PROFILE_SAMPLE_RATE, admin_token: str = PROFILE_ADMIN_TOKEN):
+        self.directory = directory
+        self.ring_size = max(1, ring_size)
+        self.sample_rate = sample_rate
+        self.admin_token = admin_token
+        self._active = threading.Lock()
+        self._sequence = itertools.count()
+
+    def requested(self, headers: Mapping[str, str], sample: bool = True) -> bool:
+        """
+        Decide whether a request should be profiled: an authorised X-Profile flag or sampling.
+
+        Args:
+            headers: The request headers
+            sample: Whether the request may be sampled (False for e.g. health probes)
+
+        Returns:
+            bool: True if the request should be profiled
+        """
+        if headers.get("X-Profile") == "1":
+            if self.authorised(headers):
+                return True
+            logger.warning("Profiling requested without a valid admin token")
+        return sample and self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def authorised(self, headers: Mapping[str, str]) -> bool:
+        """True if the headers carry the admin token (and one is configured)."""
+        # Compared as bytes: compare_digest raises TypeError on non-ASCII str
+        supplied = headers.get("X-Admin-Token", "").encode("utf-8", "surrogateescape")
+        return bool(self.admin_token) and hmac.compare_digest(supplied, self.admin_token.encode("utf-8"))
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """
+        Start profiling the current thread.
+
+        Returns:
+            Optional[cProfile.Profile]: The running profiler, or None if another request is being profiled
+        """
+        if not self._active.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiling tool is active in this interpreter
+            self._active.release()
+            logger.warning(f"Could not start the request profiler: {e}")
+            return None
+        return profiler
+
+    def new_id(self, label: str) -> str:
+        """
+        Allocate a profile id, e.g. to return it before a streamed response finishes.
+
+        Args:
+            label: Short description of the request (e.g. "POST /"), used in the file name
+
+        Returns:
+            str: The id to pass to stop()
+        """
+        safe_label = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:40]
+        # Millisecond timestamp first, so ids sort by age; the sequence orders (and keeps apart)
+        # profiles written within the same millisecond
+        return f"{int(time.time() * 1000)}-{os.getpid()}-{next(self._sequence):06d}-{safe_label}"
+
+    def stop(self, profiler: cProfile.Profile, label: str, profile_id: Optional[str] = None) -> Optional[str]:
+        """
+        Stop a profiler started by start() and write its output to the ring.
+
+        Args:
+            profiler: The profiler returned by start()
+            label: Short description of the request (e.g. "POST /"), used in the file name
+            profile_id: Id allocated earlier with new_id (default: a new one)
+
+        Returns:
+            Optional[str]: The profile id (file name without extension), or None if writing failed
+        """
+        try:
+            profiler.disable()
+        finally:
+            self._active.release()
+        profile_id = profile_id or self.new_id(label)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, profile_id)
+            profiler.dump_stats(path + ".prof")
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+            with open(path + ".txt", "w", encoding="utf-8") as f:
+                f.write(f"{label}\n{summary.getvalue()}")
+            self._trim()
+        except OSError as e:
+            logger.error(f"Error writing request profile: {e}")
+            return None
+        logger.info(f"Request profile written: {profile_id}")
+        return profile_id
+
+    def _trim(self) -> None:
+        """Delete the oldest profiles beyond ring_size."""
+        for profile_id in self.list()[self.ring_size:]:
+            for extension in (".prof", ".txt"):
+                try:
+                    os.remove(os.path.join(self.directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[str]:
+        """
+        Return the ids of the stored profiles, newest first.
+
+        Returns:
+            List[str]: Profile ids
+        """
+        try:
+            names = [name[:-5] for name in os.listdir(self.directory) if name.endswith(".prof")]
+        except FileNotFoundError:
+            return []
+        return sorted(names, reverse=True)
+
+    def summary(self, profile_id: str) -> Optional[str]:
+        """
+        Return the text summary of a stored profile.
+
+        Args:
+            profile_id: An id returned by list()
+
+        Returns:
+            Optional[str]: The summary, or None if there is no such profile
+        """
+        if profile_id not in self.list():
+            return None
+        with open(os.path.join(self.directory, profile_id + ".txt"), "r", encoding="utf-8") as f:
+            return f.read()
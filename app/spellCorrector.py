@@ -1,27 +1,94 @@
 import os 
 import logging
 import pickle
-import difflib
 import re
+import time
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from correctionTable import CorrectionTable
+from languageModel import TrigramLanguageModel
+from logPipeline import RateLimitFilter
+from lruCache import LRUCache
+from metrics import (SPELL_CORRECTED_TOKENS, SPELL_SUGGESTION_CALLS, SPELL_SUGGESTION_SECONDS,
+                     SPELL_TEXT_TOKENS, SPELL_TOKEN_LOOKUPS)
+from spellEngines import DifflibEngine, build_engine, default_engine
+from vocabFile import load_vocabulary
 
 CUSTOM_CORPUS = None
+SPELL_ENGINE = None
+LANGUAGE_MODEL = None
+CORRECTION_TABLE = None
+# Process-wide memo of token -> candidate corrections; cleared whenever the corpus,
+# engine or language model changes
+CORRECTION_CACHE = LRUCache(int(os.environ.get("SPELL_CACHE_SIZE", "50000")))
+# Number of candidates per misspelt token that the language model reranks
+NBEST = int(os.environ.get("SPELL_NBEST", "5"))
+DEFAULT_BATCH_SIZE = 1000
 logger = logging.getLogger(__name__)
+# Per-token messages use their own rate-limited logger and lazy %-formatting, so a
+# garbled input costs neither string building nor a flood of log lines
+token_logger = logging.getLogger(f"{__name__}.tokens")
+token_logger.addFilter(RateLimitFilter())
+
+# Token kinds produced by classify_token; only TOKEN_WORD reaches the dictionary
+TOKEN_WORD = "word"
+TOKEN_MEASUREMENT = "measurement"
+TOKEN_PART_NUMBER = "part_number"
+TOKEN_NUMERIC = "numeric"
+TOKEN_URL = "url"
+TOKEN_PUNCTUATION = "punctuation"
+TOKEN_OTHER = "other"
+_CORE_KINDS = (TOKEN_URL, TOKEN_MEASUREMENT, TOKEN_NUMERIC, TOKEN_PART_NUMBER, TOKEN_WORD)
+
+_NUMBER = r'\d+(?:\.\d+)?(?:-\d+/\d+|/\d+)?'
+_UNIT = r'(?:"|\'\'|\'|°|inches|inch|in|feet|ft|gauge|ga|mm|cm|m|lf|sqft|sq|mils|mil|oz|lbs|lb|yd|gal|pcs|pc|psi)'
+# One pass over the token: leading punctuation, at most one core, trailing punctuation
+# (including a possessive 's). Alternatives are tried in order, so e.g. 28ga is a
+# measurement before it can be a part number.
+TOKEN_CLASSIFIER = re.compile(rf"""
+    (?P<prefix>[^\w]*)
+    (?:
+        (?P<url>(?:https?://|www\.)\S+?)
+      | (?P<measurement>{_NUMBER}{_UNIT}?(?:[xX]{_NUMBER}{_UNIT}?)+|{_NUMBER}{_UNIT}|\d+(?:\.\d+)?(?:-\d+/\d+|/\d+))
+      | (?P<numeric>[-+]?\d+(?:[.,]\d+)*%?)
+      | (?P<part_number>(?=[A-Za-z0-9\-./]*\d)(?=[A-Za-z0-9\-./]*[A-Za-z])[A-Za-z0-9]+(?:[-./][A-Za-z0-9]+)*)
+      | (?P<word>[A-Za-z]+(?:-[A-Za-z]+)*)
+    )?
+    (?P<suffix>(?:['’]s)?[^\w]*)
+""", re.VERBOSE)
+_MIXED_TOKEN = re.compile(r'(?=.*\d)(?=.*[a-zA-Z])', re.DOTALL)
+
+TokenClass = namedtuple("TokenClass", ["kind", "prefix", "core", "suffix"])
 
-def load_corpus(corpus_path: str = "app/customCorpus.pkl") -> bool:
+def load_corpus(corpus_path: str = "app/customCorpus.vocab", index_path: Optional[str] = None,
+                engine: Optional[str] = None) -> bool:
     """
-    Load the custom corpus from pickle file.
+    Load the custom corpus and prepare the correction engine.
+    
+    A .vocab file (see vocabFile.py) is decoded into a frozenset for fast membership
+    checks, or kept memory-mapped with SPELL_VOCAB_IN_MEMORY=0; any other path is
+    unpickled as a set of words.
     
     Args:
-        corpus_path: Path to the pickle file containing the corpus
+        corpus_path: Path to the .vocab file or pickle file containing the corpus
+        index_path: Optional path to a prebuilt index for engines that support one
+        engine: Correction engine name (default: SPELL_ENGINE env var, else "delete" with a
+            prebuilt index and "ngram" without one; see spellEngines.default_engine)
         
     Returns:
         bool: True if corpus loaded successfully, False otherwise
     """
-    global CUSTOM_CORPUS
+    global CUSTOM_CORPUS, SPELL_ENGINE, CORRECTION_TABLE
+    SPELL_ENGINE = None
+    CORRECTION_CACHE.clear()
     try:
-        with open(corpus_path, "rb") as f:
-            CUSTOM_CORPUS = pickle.load(f)
+        CUSTOM_CORPUS = load_vocabulary(corpus_path)
         logger.info(f"Corpus loaded successfully from {corpus_path}")
+        if CORRECTION_TABLE is not None and CORRECTION_TABLE.corpus_size != len(CUSTOM_CORPUS):
+            logger.warning("Correction table was built against a different corpus; dropping it")
+            CORRECTION_TABLE = None
+        load_engine(engine or default_engine(index_path), index_path)
         return True
     except FileNotFoundError:
         logger.error(f"Corpus file not found: {corpus_path}")
@@ -36,6 +103,109 @@ def load_corpus(corpus_path: str = "app/customCorpus.pkl") -> bool:
         CUSTOM_CORPUS = set()
         return False
 
+def load_engine(engine: str, index_path: Optional[str] = None) -> bool:
+    """
+    Build the named correction engine over the current corpus.
+    
+    Args:
+        engine: Correction engine name (see spellEngines.ENGINES)
+        index_path: Optional path to a prebuilt index
+        
+    Returns:
+        bool: True if the engine is ready, False if suggestions fall back to difflib
+    """
+    global SPELL_ENGINE
+    try:
+        if CUSTOM_CORPUS is None:
+            return False
+        SPELL_ENGINE = build_engine(engine, CUSTOM_CORPUS, index_path)
+        CORRECTION_CACHE.clear()
+        return True
+    except Exception as e:
+        logger.error(f"Error preparing spell engine '{engine}', falling back to difflib: {e}")
+        SPELL_ENGINE = DifflibEngine(CUSTOM_CORPUS)
+        CORRECTION_CACHE.clear()
+        return False
+
+def load_language_model(model_path: str = "app/product.lm") -> bool:
+    """
+    Load the trigram language model used to rerank spelling candidates in context.
+    
+    Args:
+        model_path: Path to a model written by languageModel.py
+        
+    Returns:
+        bool: True if the model loaded, False if corrections stay context-free
+    """
+    global LANGUAGE_MODEL
+    try:
+        LANGUAGE_MODEL = TrigramLanguageModel.load(model_path)
+        return True
+    except FileNotFoundError:
+        logger.info(f"No language model at {model_path}; corrections are context-free")
+        LANGUAGE_MODEL = None
+        return False
+    except Exception as e:
+        logger.error(f"Error loading language model: {e}")
+        LANGUAGE_MODEL = None
+        return False
+    finally:
+        CORRECTION_CACHE.clear()
+
+def load_correction_table(table_path: str = "app/corrections.json") -> bool:
+    """
+    Load the precompiled misspelling -> correction table checked before any fuzzy search.
+    
+    The table is rejected if it was built against a corpus of a different size.
+    
+    Args:
+        table_path: Path to a table written by spellcheck/build_correction_table.py
+        
+    Returns:
+        bool: True if the table loaded, False otherwise
+    """
+    global CORRECTION_TABLE
+    try:
+        corpus_size = len(CUSTOM_CORPUS) if CUSTOM_CORPUS is not None else None
+        CORRECTION_TABLE = CorrectionTable.load(table_path, corpus_size=corpus_size)
+        return CORRECTION_TABLE is not None
+    except Exception as e:
+        logger.error(f"Error loading correction table: {e}")
+        CORRECTION_TABLE = None
+        return False
+    finally:
+        CORRECTION_CACHE.clear()
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Return hit/miss/eviction counters of the token correction cache.
+    
+    Returns:
+        Dict[str, Any]: Cache statistics (see LRUCache.stats)
+    """
+    return CORRECTION_CACHE.stats()
+
+def classify_token(token: str) -> TokenClass:
+    """
+    Classify a whitespace token in a single precompiled regex pass.
+    
+    Args:
+        token: The token to classify
+        
+    Returns:
+        TokenClass: (kind, prefix, core, suffix) where prefix + core + suffix == token.
+        kind is one of word, measurement, part_number, numeric, url, punctuation
+        (no core at all) or other (anything the classifier does not recognise).
+    """
+    match = TOKEN_CLASSIFIER.fullmatch(token)
+    if match is None:
+        return TokenClass(TOKEN_OTHER, "", token, "")
+    for kind in _CORE_KINDS:
+        core = match.group(kind)
+        if core is not None:
+            return TokenClass(kind, match.group("prefix"), core, match.group("suffix"))
+    return TokenClass(TOKEN_PUNCTUATION, token, "", "")
+
 def is_mixed_token(word: str) -> bool:
     """
     Check if a word contains both digits and letters.
@@ -49,9 +219,9 @@ def is_mixed_token(word: str) -> bool:
     try:
         if not word or not isinstance(word, str):
             return False
-        return bool(re.search(r'\d', word)) and bool(re.search(r'[a-zA-Z]', word))
+        return _MIXED_TOKEN.match(word) is not None
     except Exception as e:
-        logger.warning(f"Error checking mixed token for '{word}': {e}")
+        token_logger.warning("Error checking mixed token for '%s': %s", word, e)
         return False
 
 def is_valid_word(word: str) -> bool:
@@ -75,36 +245,137 @@ def is_valid_word(word: str) -> bool:
         
         return word.lower() in CUSTOM_CORPUS or is_mixed_token(word)
     except Exception as e:
-        logger.warning(f"Error validating word '{word}': {e}")
+        token_logger.warning("Error validating word '%s': %s", word, e)
         return False
 
-def suggest_word(word: str, n: int = 1) -> str:
+def suggest_words(word: str, n: int = 1) -> List[str]:
     """
-    Suggest a correction for a word using difflib.
+    Suggest up to n corrections for a word, best first.
+    
+    Uses the engine chosen in load_corpus, or a difflib scan if none is loaded.
     
     Args:
         word: The word to get suggestions for
-        n: Number of suggestions to consider (default: 1)
+        n: Maximum number of suggestions (default: 1)
         
     Returns:
-        str: The suggested word or original word if no suggestions found
+        List[str]: The suggestions, empty if none were found
     """
     try:
         if not word or not isinstance(word, str):
-            return word
+            return []
         
         if CUSTOM_CORPUS is None:
             logger.warning("Corpus not loaded. Cannot suggest corrections.")
-            return word
+            return []
         
         if not isinstance(n, int) or n <= 0:
             n = 1
         
-        matches = difflib.get_close_matches(word.lower(), CUSTOM_CORPUS, n=n, cutoff=0.6)
-        return matches[0] if matches else word
+        engine = SPELL_ENGINE if SPELL_ENGINE is not None else DifflibEngine(CUSTOM_CORPUS)
+        start = time.perf_counter()
+        suggestions = engine.lookup(word.lower(), n=n, cutoff=0.6)
+        SPELL_SUGGESTION_CALLS.inc()
+        SPELL_SUGGESTION_SECONDS.observe(time.perf_counter() - start)
+        return suggestions
     except Exception as e:
-        logger.warning(f"Error suggesting word for '{word}': {e}")
-        return word
+        token_logger.warning("Error suggesting word for '%s': %s", word, e)
+        return []
+
+def suggest_word(word: str, n: int = 1) -> str:
+    """
+    Suggest a correction for a word.
+    
+    Args:
+        word: The word to get suggestions for
+        n: Number of suggestions to consider (default: 1)
+        
+    Returns:
+        str: The suggested word or original word if no suggestions found
+    """
+    matches = suggest_words(word, n)
+    return matches[0] if matches else word
+
+def word_candidates(word: str) -> Tuple[str, ...]:
+    """
+    Return the candidate corrections for a token, memoised in CORRECTION_CACHE.
+    
+    Only tokens classified as words are checked against the dictionary; measurements,
+    part numbers, numbers and URLs are kept as they are. Surrounding punctuation is
+    stripped before the lookup and reattached to every candidate. Words found in the
+    correction table are answered from it without any fuzzy search.
+    
+    Args:
+        word: The token to check
+        
+    Returns:
+        Tuple[str, ...]: Empty if the token is valid or has no suggestion, otherwise
+        up to NBEST candidates (one when no language model is loaded), best first
+    """
+    cached = CORRECTION_CACHE.get(word)
+    if cached is not None:
+        return cached
+    
+    token = classify_token(word)
+    known = None
+    if token.kind == TOKEN_WORD and CORRECTION_TABLE is not None:
+        known = CORRECTION_TABLE.get(token.core.lower())
+    if known is not None:
+        candidates = (token.prefix + known + token.suffix,) if known != token.core.lower() else ()
+        outcome = "table"
+    elif token.kind != TOKEN_WORD or is_valid_word(token.core):
+        candidates = ()
+        outcome = "valid"
+    else:
+        n = NBEST if LANGUAGE_MODEL is not None else 1
+        candidates = tuple(token.prefix + c + token.suffix for c in suggest_words(token.core, n))
+        outcome = "corrected" if candidates else "unresolved"
+        if candidates:
+            token_logger.debug("Candidates for '%s': %s", word, candidates)
+    SPELL_TOKEN_LOOKUPS.inc(outcome=outcome)
+    CORRECTION_CACHE.put(word, candidates)
+    return candidates
+
+def correct_word(word: str) -> str:
+    """
+    Correct a single token without context.
+    
+    Args:
+        word: The token to correct
+        
+    Returns:
+        str: The token itself if valid, otherwise the best suggested correction
+    """
+    candidates = word_candidates(word)
+    return candidates[0] if candidates else word
+
+def _choose_corrections(words: List[str], candidates: List[Tuple[str, ...]]) -> List[str]:
+    """
+    Pick one output token per input token.
+    
+    With a language model loaded, tokens with several candidates are reranked
+    using only a two-token window on each side: the corrections already chosen
+    on the left and the best candidates on the right. The cost per token is
+    therefore independent of the text length.
+    
+    Args:
+        words: The input tokens
+        candidates: The candidates for each token (see word_candidates)
+        
+    Returns:
+        List[str]: The corrected tokens
+    """
+    if LANGUAGE_MODEL is None:
+        return [c[0] if c else w for w, c in zip(words, candidates)]
+    
+    chosen = []
+    for i, (word, options) in enumerate(zip(words, candidates)):
+        if len(options) <= 1:
+            chosen.append(options[0] if options else word)
+            continue
+        right = [c[0] if c else w for w, c in zip(words[i + 1:i + 3], candidates[i + 1:i + 3])]
+        chosen.append(LANGUAGE_MODEL.best_candidate(chosen[-2:], options, right))
+    return chosen
 
 def correct_text(text: str) -> str:
     """
@@ -128,27 +399,94 @@ def correct_text(text: str) -> str:
                 return text
         
         words = text.split()
-        corrected = []
+        candidates = []
         
         for word in words:
-            try:
-                if is_valid_word(word):
-                    corrected.append(word)
-                else:
-                    suggested = suggest_word(word)
-                    corrected.append(suggested)
-                    if suggested != word:
-                        logger.debug(f"Corrected '{word}' to '{suggested}'")
-            except Exception as e:
-                logger.warning(f"Error processing word '{word}': {e}")
-                corrected.append(word)  # Keep original word if error occurs
-        
-        return " ".join(corrected)
+            candidates.append(_candidates_safely(word))
+        
+        SPELL_TEXT_TOKENS.observe(len(words))
+        SPELL_CORRECTED_TOKENS.inc(sum(1 for options in candidates if options))
+        return " ".join(_choose_corrections(words, candidates))
     
     except Exception as e:
         logger.error(f"Error correcting text: {e}")
         return text or ""
 
+def _candidates_safely(word: str) -> Tuple[str, ...]:
+    """Return the candidates for a token, keeping the original if correction fails."""
+    try:
+        return word_candidates(word)
+    except Exception as e:
+        token_logger.warning("Error processing word '%s': %s", word, e)
+        return ()  # Keep original word if error occurs
+
+def _correct_batch(texts: List[str]) -> List[str]:
+    """
+    Correct a batch of texts, resolving each distinct token only once.
+    
+    Args:
+        texts: The texts to correct
+        
+    Returns:
+        List[str]: The corrected texts, identical to correct_text on each input
+    """
+    if CUSTOM_CORPUS is None:
+        logger.warning("Corpus not loaded. Loading default corpus.")
+        if not load_corpus():
+            logger.error("Failed to load corpus. Returning original texts.")
+            return [text if text and isinstance(text, str) else (text or "") for text in texts]
+    
+    candidates: Dict[str, Tuple[str, ...]] = {}
+    tokenized = []
+    for text in texts:
+        if not text or not isinstance(text, str):
+            logger.warning("Invalid input text provided")
+            tokenized.append(None)
+            continue
+        words = text.split()
+        for word in words:
+            if word not in candidates:
+                candidates[word] = _candidates_safely(word)
+        tokenized.append(words)
+    
+    results = []
+    for text, words in zip(texts, tokenized):
+        if words is None:
+            results.append(text or "")
+        else:
+            SPELL_TEXT_TOKENS.observe(len(words))
+            SPELL_CORRECTED_TOKENS.inc(sum(1 for word in words if candidates[word]))
+            results.append(" ".join(_choose_corrections(words, [candidates[word] for word in words])))
+    logger.debug(f"Corrected batch of {len(texts)} texts with {len(candidates)} distinct tokens")
+    return results
+
+def correct_texts(texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Correct many texts, deduplicating token work across each batch.
+    
+    Texts are consumed lazily in batches of batch_size. Within a batch every
+    distinct token is validated and, if needed, corrected exactly once before
+    the output strings are rebuilt.
+    
+    Args:
+        texts: The texts to correct
+        batch_size: Number of texts processed together (default: 1000)
+        
+    Yields:
+        str: The corrected texts, in input order
+    """
+    if not isinstance(batch_size, int) or batch_size <= 0:
+        batch_size = DEFAULT_BATCH_SIZE
+    
+    batch = []
+    for text in texts:
+        batch.append(text)
+        if len(batch) >= batch_size:
+            yield from _correct_batch(batch)
+            batch = []
+    if batch:
+        yield from _correct_batch(batch)
+
 # import re
 # import kenlm
 # from spellchecker import SpellChecker
@@ -0,0 +1,109 @@
+"""
+Correction engines behind spellCorrector.suggest_word.
+
+An engine is any object with a ``lookup(word, n, cutoff) -> List[str]`` method
+returning up to n lowercase suggestions, closest first. Engines are registered
+by name in ENGINES and selected with the SPELL_ENGINE environment variable or
+the ``engine`` argument of spellCorrector.load_corpus; without either, see
+default_engine.
+"""
+import difflib
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+from deleteIndex import DeleteIndex
+from ngramIndex import NgramIndex
+
+logger = logging.getLogger(__name__)
+
+# Engine named by the environment; when unset, default_engine decides
+CONFIGURED_ENGINE = os.environ.get("SPELL_ENGINE") or None
+# Used when no prebuilt delete index exists: builds in ~2s instead of ~12s and a fraction of the memory
+FALLBACK_ENGINE = "ngram"
+
+
+class DifflibEngine:
+    """Reference engine: a linear difflib scan over the whole corpus."""
+
+    def __init__(self, words: Iterable[str]):
+        self.words = words
+
+    def lookup(self, word: str, n: int = 1, cutoff: float = 0.6) -> List[str]:
+        """
+        Return the best corrections for word using difflib.get_close_matches.
+
+        Args:
+            word: The lowercase word to look up
+            n: Maximum number of suggestions to return
+            cutoff: Minimum difflib similarity ratio for a suggestion
+
+        Returns:
+            List[str]: Up to n suggestions
+        """
+        return difflib.get_close_matches(word, self.words, n=n, cutoff=cutoff)
+
+
+def _build_difflib(corpus, index_path: Optional[str]):
+    return DifflibEngine(corpus)
+
+
+def _build_delete(corpus, index_path: Optional[str]):
+    index = None
+    if index_path and os.path.exists(index_path):
+        index = DeleteIndex.load(index_path, corpus_size=len(corpus))
+    return index if index is not None else DeleteIndex.build(corpus)
+
+
+def _build_ngram(corpus, index_path: Optional[str]):
+    return NgramIndex.build(corpus)
+
+
+ENGINES: Dict[str, Callable] = {
+    "difflib": _build_difflib,
+    "delete": _build_delete,
+    "ngram": _build_ngram,
+}
+
+
+def default_engine(index_path: Optional[str] = None) -> str:
+    """
+    Pick the engine when none is named: SPELL_ENGINE if set, else "delete" when its
+    prebuilt index exists and "ngram" when it does not (building the delete index
+    in every process costs seconds of CPU and hundreds of MB each).
+
+    Args:
+        index_path: Prebuilt delete index the caller would load
+
+    Returns:
+        str: Registered engine name
+    """
+    if CONFIGURED_ENGINE:
+        return CONFIGURED_ENGINE
+    if index_path and os.path.exists(index_path):
+        return "delete"
+    logger.info(f"No prebuilt delete index{f' at {index_path}' if index_path else ''}; using the "
+                f"'{FALLBACK_ENGINE}' engine (build one with python app/deleteIndex.py --out app/customCorpus.index)")
+    return FALLBACK_ENGINE
+
+
+def build_engine(name: str, corpus, index_path: Optional[str] = None):
+    """
+    Create a correction engine over the corpus.
+
+    Args:
+        name: Registered engine name (see ENGINES)
+        corpus: Collection of lowercase corpus words
+        index_path: Optional prebuilt index file, used by engines that support one
+
+    Returns:
+        An object with a lookup(word, n, cutoff) method
+
+    Raises:
+        ValueError: If the engine name is not registered
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown spell engine '{name}'. Available: {', '.join(sorted(ENGINES))}")
+    engine = ENGINES[name](corpus, index_path)
+    logger.info(f"Spell engine '{name}' ready")
+    return engine
@@ -0,0 +1,84 @@
+"""Escalation rate, entity F1 and per-document latency of the fast/transformer cascade.
+
+For each threshold, every document of the evaluation DocBin is processed on its
+own (as in the web app). "fast only" is the cascade with threshold 0 (never
+escalates); "transformer only" calls the full pipeline directly.
+
+Usage:
+    python benchmarks/bench_cascade.py --docbin training/test.spacy --thresholds 0.5 0.8 0.9 0.95 0.99
+"""
+import argparse
+import os
+import sys
+import time
+
+import spacy
+from spacy.tokens import DocBin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from ner import extract_entities, extract_entities_cascade, load_fast_model, load_model  # noqa: E402
+
+
+def load_gold(docbin_path, limit):
+    """Read texts and gold (start, end, label) char spans from a DocBin."""
+    vocab = spacy.blank("en").vocab
+    docs = [doc for _, doc in zip(range(limit), DocBin().from_disk(docbin_path).get_docs(vocab))]
+    return [doc.text for doc in docs], [{(e.start_char, e.end_char, e.label_) for e in doc.ents} for doc in docs]
+
+
+def f1(predicted, gold):
+    """Micro-averaged entity F1 over exact (start, end, label) matches."""
+    tp = sum(len(p & g) for p, g in zip(predicted, gold))
+    n_pred = sum(len(p) for p in predicted)
+    n_gold = sum(len(g) for g in gold)
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_gold if n_gold else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(texts, fast_nlp, nlp, threshold):
+    """Process texts one by one; return predicted spans, escalation flags and latencies.
+    A threshold of None skips the fast tier."""
+    predicted, escalated, latencies = [], [], []
+    for text in texts:
+        start = time.perf_counter()
+        if threshold is None:
+            ents, flag = extract_entities(text, nlp), True
+        else:
+            (ents,), (flag,) = extract_entities_cascade([text], fast_nlp, nlp, threshold=threshold)
+        latencies.append(time.perf_counter() - start)
+        predicted.append({(e["start"], e["end"], e["label"]) for e in ents})
+        escalated.append(flag)
+    return predicted, escalated, latencies
+
+
+def main(docbin_path, limit, thresholds):
+    fast_nlp = load_fast_model()
+    nlp = load_model()
+    texts, gold = load_gold(docbin_path, limit)
+    # Warm up lazy initialisation (tokenizer caches, torch kernels)
+    run(texts[:4], fast_nlp, nlp, threshold=2.0)
+
+    print(f"{len(texts)} documents from {docbin_path}")
+    print(f"{'mode':<22} {'escalated':>9} {'F1':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    rows = [("fast only", 0.0)] + [(f"cascade @{t}", t) for t in thresholds] + [("transformer only", None)]
+    for name, threshold in rows:
+        predicted, escalated, latencies = run(texts, fast_nlp, nlp, threshold)
+        print(f"{name:<22} {sum(escalated) / len(texts):>9.1%} {f1(predicted, gold):>7.3f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the two-tier NER cascade.")
+    parser.add_argument('--docbin', type=str, default='training/test.spacy', help='DocBin with gold entities')
+    parser.add_argument('--limit', type=int, default=500, help='Maximum number of documents')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.5, 0.8, 0.9, 0.95, 0.99],
+                        help='Escalation thresholds to try')
+    args = parser.parse_args()
+    main(args.docbin, args.limit, args.thresholds)
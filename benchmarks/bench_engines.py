@@ -0,0 +1,101 @@
+"""Per-engine build time, memory and lookup latency report for the spell correction engines.
+
+Each engine is measured in a fresh subprocess so resident memory numbers do not
+leak between engines.
+
+Usage:
+    python benchmarks/bench_engines.py --engines difflib delete ngram --samples 200
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "app"))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_suggest import load_words, make_typo  # noqa: E402
+from spellEngines import ENGINES, build_engine  # noqa: E402
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def measure(engine_name, corpus_path, samples, seed):
+    """Build one engine and time lookups; runs inside the worker subprocess."""
+    words = load_words(corpus_path)
+    corpus = set(words)
+    rng = random.Random(seed)
+    targets = [w for w in rng.sample(words, samples * 3) if len(w) >= 4][:samples]
+    queries = [make_typo(w, rng) for w in targets]
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    engine = build_engine(engine_name, corpus)
+    build_seconds = time.perf_counter() - start
+    rss_after = current_rss_mb()
+
+    latencies = []
+    recovered = 0
+    for query, target in zip(queries, targets):
+        start = time.perf_counter()
+        matches = engine.lookup(query, n=1, cutoff=0.6)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recovered += bool(matches) and matches[0] == target
+    latencies.sort()
+    return {
+        "engine": engine_name,
+        "build_s": build_seconds,
+        "index_mb": rss_after - rss_before,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "recovered": recovered / len(queries),
+        "samples": len(queries),
+    }
+
+
+def main(engines, corpus_path, samples, difflib_samples, seed):
+    rows = []
+    for name in engines:
+        n = difflib_samples if name == "difflib" else samples
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", name,
+             "--corpus", corpus_path, "--samples", str(n), "--seed", str(seed)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"{'engine':<8} {'samples':>7} {'build s':>8} {'index MB':>9} {'mean ms':>9} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'recovered':>9}")
+    for r in rows:
+        print(f"{r['engine']:<8} {r['samples']:>7} {r['build_s']:>8.1f} {r['index_mb']:>9.1f} "
+              f"{r['mean_ms']:>9.3f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['recovered']:>9.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare spell correction engines.")
+    parser.add_argument('--engines', nargs='+', default=sorted(ENGINES), help='Engines to measure')
+    parser.add_argument('--corpus', type=str, default='Ner/customCorpus.txt', help='One word per line corpus')
+    parser.add_argument('--samples', type=int, default=200, help='Typos to look up per engine')
+    parser.add_argument('--difflib_samples', type=int, default=20, help='Typos to look up with difflib (slow)')
+    parser.add_argument('--seed', type=int, default=13, help='Random seed for typo generation')
+    parser.add_argument('--worker', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.corpus, args.samples, args.seed)))
+    else:
+        main(args.engines, args.corpus, args.samples, args.difflib_samples, args.seed)
@@ -0,0 +1,84 @@
+"""Throughput and latency of concurrent single-text NER calls, direct vs coalesced by the micro-batcher.
+
+Each of --concurrency threads sends texts one at a time, like request threads
+of a gunicorn worker. Direct calls run nlp(text) per request; coalesced calls
+go through MicroBatcher, which runs nlp.pipe on whatever arrived within max_wait.
+
+Usage:
+    python benchmarks/bench_microbatch.py --csv output/spacy_test_data.csv --concurrency 8 --max_wait_ms 2 5 10
+"""
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from microBatcher import MICROBATCH_MAX_SIZE, MicroBatcher  # noqa: E402
+from ner import extract_entities, extract_entities_batch, load_model  # noqa: E402
+
+
+def load_texts(csv_path, column, limit):
+    """Read a text column from a CSV."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [row[column] for _, row in zip(range(limit), csv.DictReader(f)) if row[column]]
+
+
+def run_concurrent(texts, concurrency, call):
+    """Send texts from concurrency threads; return wall seconds and per-call latencies."""
+    latencies = []
+    lock = threading.Lock()
+    shards = [texts[i::concurrency] for i in range(concurrency)]
+
+    def client(shard):
+        for text in shard:
+            start = time.perf_counter()
+            call(text)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(shard,)) for shard in shards]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(name, texts, elapsed, latencies, extra=""):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000
+    print(f"{name:<22} {len(texts) / elapsed:>9.1f} {p50:>8.1f} {p99:>8.1f}{extra}")
+
+
+def main(csv_path, column, limit, concurrency, max_size, waits):
+    nlp = load_model()
+    texts = load_texts(csv_path, column, limit)
+    extract_entities_batch(texts[:8], nlp, batch_size=8)  # warm up
+
+    print(f"{len(texts)} texts, {concurrency} concurrent clients")
+    print(f"{'mode':<22} {'docs/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    elapsed, latencies = run_concurrent(texts, concurrency, lambda text: extract_entities(text, nlp))
+    report("direct nlp(text)", texts, elapsed, latencies)
+    for wait in waits:
+        batcher = MicroBatcher(lambda batch: extract_entities_batch(batch, nlp, batch_size=len(batch)),
+                               max_size=max_size, max_wait_ms=wait)
+        elapsed, latencies = run_concurrent(texts, concurrency, batcher)
+        stats = batcher.stats()
+        report(f"batched wait={wait}ms", texts, elapsed, latencies,
+               f"  mean batch {stats['mean_batch_size']:.1f}, queue p99 {stats['queue_delay_ms']['p99']:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the NER micro-batcher under concurrency.")
+    parser.add_argument('--csv', type=str, default='output/spacy_test_data.csv', help='CSV with a text column')
+    parser.add_argument('--column', type=str, default='article', help='Text column')
+    parser.add_argument('--limit', type=int, default=400, help='Maximum number of texts')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client threads')
+    parser.add_argument('--max_size', type=int, default=MICROBATCH_MAX_SIZE, help='Maximum batch size')
+    parser.add_argument('--max_wait_ms', type=float, nargs='+', default=[2, 5, 10], help='Maximum waits to try')
+    args = parser.parse_args()
+    main(args.csv, args.column, args.limit, args.concurrency, args.max_size, args.max_wait_ms)
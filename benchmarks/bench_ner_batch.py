@@ -0,0 +1,59 @@
+"""NER throughput (docs/sec) of one-at-a-time extraction vs nlp.pipe batches.
+
+Texts are taken from the evaluation DocBin so the length distribution matches
+real product descriptions.
+
+Usage:
+    python benchmarks/bench_ner_batch.py --docbin training/test.spacy --batch_sizes 1 4 8 16 32 64
+"""
+import argparse
+import os
+import sys
+import time
+
+import spacy
+from spacy.tokens import DocBin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from ner import extract_entities, extract_entities_batch, load_model  # noqa: E402
+
+
+def load_texts(docbin_path, limit):
+    """Read the raw texts of a DocBin."""
+    vocab = spacy.blank("en").vocab
+    docs = DocBin().from_disk(docbin_path).get_docs(vocab)
+    return [doc.text for _, doc in zip(range(limit), docs)]
+
+
+def main(docbin_path, limit, batch_sizes, n_process):
+    nlp = load_model()
+    texts = load_texts(docbin_path, limit)
+    # Warm up lazy initialisation (tokenizer caches, torch kernels)
+    extract_entities_batch(texts[:8], nlp, batch_size=8)
+
+    print(f"{len(texts)} texts from {docbin_path}, n_process={n_process}")
+    print(f"{'mode':<18} {'seconds':>9} {'docs/s':>9} {'speedup':>8}")
+    start = time.perf_counter()
+    reference = [extract_entities(text, nlp) for text in texts]
+    baseline = time.perf_counter() - start
+    print(f"{'nlp(text) loop':<18} {baseline:>9.2f} {len(texts) / baseline:>9.1f} {1:>7.2f}x")
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        results = extract_entities_batch(texts, nlp, batch_size=batch_size, n_process=n_process)
+        elapsed = time.perf_counter() - start
+        mismatches = sum(a != b for a, b in zip(results, reference))
+        note = f"  ({mismatches} docs differ from the loop)" if mismatches else ""
+        print(f"{'pipe batch=' + str(batch_size):<18} {elapsed:>9.2f} {len(texts) / elapsed:>9.1f} "
+              f"{baseline / elapsed:>7.2f}x{note}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched entity extraction.")
+    parser.add_argument('--docbin', type=str, default='training/test.spacy', help='DocBin with evaluation texts')
+    parser.add_argument('--limit', type=int, default=500, help='Maximum number of texts')
+    parser.add_argument('--batch_sizes', type=int, nargs='+', default=[1, 4, 8, 16, 32, 64], help='Batch sizes to try')
+    parser.add_argument('--n_process', type=int, default=1, help='Processes used by nlp.pipe')
+    args = parser.parse_args()
+    main(args.docbin, args.limit, args.batch_sizes, args.n_process)
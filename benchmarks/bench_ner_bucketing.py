@@ -0,0 +1,79 @@
+"""Padding waste and NER throughput of arrival-order batching vs length-bucketed batching.
+
+Texts come from a catalog CSV so the length mix (short titles next to long
+descriptions) matches production. Padding is counted in spaCy tokens: a batch
+costs batch size * its longest document.
+
+Usage:
+    python benchmarks/bench_ner_bucketing.py --csv output/spacy_test_data.csv
+    python benchmarks/bench_ner_bucketing.py --csv output/spacy_test_data.csv --padding_only
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+import spacy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from ner import (DEFAULT_BATCH_SIZE, PADDED_TOKEN_BUDGET, extract_entities_batch,  # noqa: E402
+                 extract_entities_bucketed, length_buckets, load_model)
+
+
+def load_texts(csv_path, column, limit):
+    """Read a text column from a CSV."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return [row[column] for _, row in zip(range(limit), csv.DictReader(f)) if row[column]]
+
+
+def padding(lengths, batches):
+    """Return (real tokens, padded tokens) for batches of indices into lengths."""
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    return sum(lengths), padded
+
+
+def main(csv_path, column, limit, batch_size, max_padded_tokens, padding_only):
+    nlp = spacy.blank("en") if padding_only else load_model()
+    texts = load_texts(csv_path, column, limit)
+    lengths = [len(nlp.make_doc(text)) for text in texts]
+
+    naive = [list(range(i, min(i + batch_size, len(texts)))) for i in range(0, len(texts), batch_size)]
+    bucketed = length_buckets(lengths, max_padded_tokens)
+    print(f"{len(texts)} texts from {csv_path}: tokens min {min(lengths)}, "
+          f"median {sorted(lengths)[len(lengths) // 2]}, max {max(lengths)}")
+    print(f"{'mode':<28} {'batches':>8} {'padded':>9} {'waste':>7}")
+    for name, batches in ((f"arrival order, batch={batch_size}", naive),
+                          (f"bucketed, budget={max_padded_tokens}", bucketed)):
+        real, padded = padding(lengths, batches)
+        print(f"{name:<28} {len(batches):>8} {padded:>9} {1 - real / padded:>6.1%}")
+    if padding_only:
+        return
+
+    # Warm up lazy initialisation (tokenizer caches, torch kernels)
+    extract_entities_batch(texts[:8], nlp, batch_size=8)
+    print(f"{'mode':<28} {'seconds':>9} {'docs/s':>9}")
+    start = time.perf_counter()
+    reference = extract_entities_batch(texts, nlp, batch_size=batch_size)
+    naive_s = time.perf_counter() - start
+    print(f"{'arrival order':<28} {naive_s:>9.2f} {len(texts) / naive_s:>9.1f}")
+    start = time.perf_counter()
+    results = extract_entities_bucketed(texts, nlp, max_padded_tokens=max_padded_tokens)
+    bucketed_s = time.perf_counter() - start
+    mismatches = sum(a != b for a, b in zip(results, reference))
+    note = f"  ({mismatches} docs differ)" if mismatches else ""
+    print(f"{'bucketed':<28} {bucketed_s:>9.2f} {len(texts) / bucketed_s:>9.1f}  "
+          f"{naive_s / bucketed_s:.2f}x{note}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark length-bucketed NER batching.")
+    parser.add_argument('--csv', type=str, default='output/spacy_test_data.csv', help='CSV with a text column')
+    parser.add_argument('--column', type=str, default='article', help='Text column')
+    parser.add_argument('--limit', type=int, default=2000, help='Maximum number of texts')
+    parser.add_argument('--batch_size', type=int, default=DEFAULT_BATCH_SIZE, help='Arrival-order batch size')
+    parser.add_argument('--max_padded_tokens', type=int, default=PADDED_TOKEN_BUDGET, help='Bucketed padded-token budget')
+    parser.add_argument('--padding_only', action='store_true', help='Only count padding (blank tokenizer, no model)')
+    args = parser.parse_args()
+    main(args.csv, args.column, args.limit, args.batch_size, args.max_padded_tokens, args.padding_only)
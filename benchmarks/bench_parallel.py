@@ -0,0 +1,47 @@
+"""Scaling of the process-pool spell corrector from 1 to N worker processes.
+
+Usage:
+    python benchmarks/bench_parallel.py --csv output/spacy_test_data.csv --max_workers 8 --limit 1000
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from parallelCorrector import correct_texts_parallel  # noqa: E402
+
+
+def main(csv_path, column, limit, max_workers, chunk_size, engine):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        texts = [row[column] for row in csv.DictReader(f)][:limit]
+
+    print(f"{len(texts)} texts, chunk_size={chunk_size}, engine={engine or 'default'}, cores={os.cpu_count()}")
+    print(f"{'workers':>7} {'seconds':>9} {'texts/s':>9} {'speedup':>8}")
+    baseline = None
+    reference = None
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        results = list(correct_texts_parallel(texts, workers=workers, chunk_size=chunk_size, engine=engine))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        reference = reference or results
+        if results != reference:
+            print(f"WARNING: output with {workers} workers differs from 1 worker")
+        print(f"{workers:>7} {elapsed:>9.1f} {len(texts) / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark parallel spell correction.")
+    parser.add_argument('--csv', type=str, default='output/spacy_test_data.csv', help='CSV with a text column')
+    parser.add_argument('--column', type=str, default='article', help='Text column to correct')
+    parser.add_argument('--limit', type=int, default=1000, help='Maximum number of texts')
+    parser.add_argument('--max_workers', type=int, default=os.cpu_count() or 1, help='Largest pool size to try')
+    parser.add_argument('--chunk_size', type=int, default=100, help='Texts per worker task')
+    parser.add_argument('--engine', type=str, default='ngram', help='Correction engine (ngram builds fastest)')
+    args = parser.parse_args()
+    main(args.csv, args.column, args.limit, args.max_workers, args.chunk_size, args.engine)
@@ -0,0 +1,101 @@
+"""Compare delete-index suggestions against the difflib scan on Ner/customCorpus.txt.
+
+Usage:
+    python benchmarks/bench_suggest.py --samples 200 --difflib_samples 30
+"""
+import argparse
+import difflib
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from deleteIndex import DeleteIndex  # noqa: E402
+
+
+def load_words(path):
+    """Load one word per line from a text corpus."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def make_typo(word, rng):
+    """Apply one or two random character edits to a word."""
+    for _ in range(rng.choice((1, 1, 2))):
+        op = rng.choice(("delete", "insert", "replace", "transpose"))
+        i = rng.randrange(len(word))
+        if op == "delete" and len(word) > 1:
+            word = word[:i] + word[i + 1:]
+        elif op == "insert":
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif op == "transpose" and i < len(word) - 1:
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word
+
+
+def time_lookups(fn, queries):
+    """Run fn over queries and return (results, per-query latencies in ms)."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def summarize(name, latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    mean = sum(latencies) / len(latencies)
+    print(f"{name:<10} n={len(latencies):<5} mean={mean:9.3f}ms  p50={p50:9.3f}ms  p99={p99:9.3f}ms")
+
+
+def main(corpus_path, samples, difflib_samples, seed):
+    words = load_words(corpus_path)
+    corpus = set(words)
+    rng = random.Random(seed)
+    targets = [w for w in rng.sample(words, samples * 3) if len(w) >= 4][:samples]
+    queries = [make_typo(w, rng) for w in targets]
+
+    start = time.perf_counter()
+    index = DeleteIndex.build(corpus)
+    print(f"Built delete index over {len(corpus)} words in {time.perf_counter() - start:.1f}s")
+
+    def index_suggest(word):
+        matches = index.lookup(word, n=1, cutoff=0.6)
+        return matches[0] if matches else word
+
+    def difflib_suggest(word):
+        matches = difflib.get_close_matches(word, corpus, n=1, cutoff=0.6)
+        return matches[0] if matches else word
+
+    index_results, index_latencies = time_lookups(index_suggest, queries)
+    difflib_queries = queries[:difflib_samples]
+    difflib_results, difflib_latencies = time_lookups(difflib_suggest, difflib_queries)
+
+    summarize("difflib", difflib_latencies)
+    summarize("index", index_latencies)
+    speedup = (sum(difflib_latencies) / len(difflib_latencies)) / (sum(index_latencies) / len(index_latencies))
+    print(f"Mean speedup: {speedup:.0f}x")
+
+    agree = sum(a == b for a, b in zip(index_results, difflib_results))
+    print(f"Agreement with difflib: {agree}/{len(difflib_results)}")
+    for name, results in (("difflib", difflib_results), ("index", index_results[:difflib_samples])):
+        recovered = sum(r == t for r, t in zip(results, targets))
+        print(f"{name:<10} recovered the original word for {recovered}/{len(results)} typos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark spell suggestion engines.")
+    parser.add_argument('--corpus', type=str, default='Ner/customCorpus.txt', help='One word per line corpus')
+    parser.add_argument('--samples', type=int, default=200, help='Typos to look up with the index')
+    parser.add_argument('--difflib_samples', type=int, default=30, help='Typos to look up with difflib (slow)')
+    parser.add_argument('--seed', type=int, default=13, help='Random seed for typo generation')
+    args = parser.parse_args()
+    main(args.corpus, args.samples, args.difflib_samples, args.seed)
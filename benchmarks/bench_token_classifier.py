@@ -0,0 +1,59 @@
+"""How many suggestion calls the token classifier avoids on a CSV of product texts.
+
+The old path sent every token that was neither in the corpus nor "mixed"
+(digits and letters) to the suggestion engine. The new path only sends word
+tokens whose punctuation-stripped core is missing from the corpus.
+
+Usage:
+    python benchmarks/bench_token_classifier.py --csv output/spacy_test_data.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import spellCorrector  # noqa: E402
+from spellCorrector import TOKEN_WORD, classify_token, is_mixed_token  # noqa: E402
+from vocabFile import load_vocabulary  # noqa: E402
+
+
+def main(csv_path, column, corpus_path):
+    corpus = load_vocabulary(corpus_path)
+    # Only membership is needed here; skip building a correction engine
+    spellCorrector.CUSTOM_CORPUS = corpus
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        tokens = [token for row in csv.DictReader(f) for token in row[column].split()]
+
+    start = time.perf_counter()
+    classes = [classify_token(token) for token in tokens]
+    classify_us = (time.perf_counter() - start) / len(tokens) * 1e6
+
+    kinds = Counter(c.kind for c in classes)
+    wrapped = sum(1 for c in classes if c.kind == TOKEN_WORD and (c.prefix or c.suffix))
+    old_calls = [t for t in tokens if not (t.lower() in corpus or is_mixed_token(t))]
+    new_calls = [t for t, c in zip(tokens, classes) if c.kind == TOKEN_WORD and c.core.lower() not in corpus]
+
+    print(f"{len(tokens)} tokens from {csv_path} ({classify_us:.2f}us per classification)")
+    for kind, count in kinds.most_common():
+        print(f"  {kind:<12} {count:>7} ({count / len(tokens):.1%})")
+    print(f"  punctuation-wrapped words: {wrapped}")
+    print(f"Suggestion calls, per token:    old {len(old_calls):>6}  new {len(new_calls):>6}  "
+          f"avoided {len(old_calls) - len(new_calls)} ({1 - len(new_calls) / max(1, len(old_calls)):.1%})")
+    print(f"Suggestion calls, distinct:     old {len(set(old_calls)):>6}  new {len(set(new_calls)):>6}")
+    still_called = set(new_calls)
+    avoided = Counter(t for t in old_calls if t not in still_called)
+    print("Most common avoided tokens:", [t for t, _ in avoided.most_common(15)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure suggestion calls avoided by the token classifier.")
+    parser.add_argument('--csv', type=str, default='output/spacy_test_data.csv', help='CSV with a text column')
+    parser.add_argument('--column', type=str, default='article', help='Text column')
+    parser.add_argument('--corpus', type=str, default='app/customCorpus.vocab', help='Spell corpus')
+    args = parser.parse_args()
+    main(args.csv, args.column, args.corpus)
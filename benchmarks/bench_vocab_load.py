@@ -0,0 +1,86 @@
+"""Startup time, memory and membership latency of the pickled vs memory-mapped corpus.
+
+Each format is loaded in a fresh subprocess; the .vocab file both decoded into a
+frozenset (the default, SPELL_VOCAB_IN_MEMORY=1) and with lookups on the mapping.
+RssAnon is private heap that every worker pays for separately; RssFile is
+file-backed and shared between processes mapping the same file.
+
+Usage:
+    python benchmarks/bench_vocab_load.py --pickle app/customCorpus.pkl --vocab app/customCorpus.vocab
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from vocabFile import load_vocabulary  # noqa: E402
+
+
+def memory_kb():
+    """Return RssAnon and RssFile of this process in kB (Linux only)."""
+    fields = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def measure(path, in_memory, probes, seed):
+    """Load one corpus file and time membership checks; runs inside the worker subprocess."""
+    before = memory_kb()
+    start = time.perf_counter()
+    corpus = load_vocabulary(path, in_memory=in_memory)
+    load_ms = (time.perf_counter() - start) * 1000
+    after = memory_kb()
+
+    rng = random.Random(seed)
+    words = ["".join(rng.choice("abcdefghilmnoprstu") for _ in range(rng.randint(3, 10))) for _ in range(probes)]
+    start = time.perf_counter()
+    hits = sum(word in corpus for word in words)
+    lookup_us = (time.perf_counter() - start) / probes * 1e6
+    after_lookups = memory_kb()
+    return {
+        "path": path if in_memory or not path.endswith(".vocab") else f"{path} (mmap)",
+        "load_ms": load_ms,
+        "anon_mb": (after["RssAnon"] - before["RssAnon"]) / 1024,
+        "file_mb": (after_lookups["RssFile"] - before["RssFile"]) / 1024,
+        "lookup_us": lookup_us,
+        "hits": hits,
+    }
+
+
+def main(paths, probes, seed):
+    print(f"{'corpus':<28} {'load ms':>9} {'private MB':>11} {'shared MB':>10} {'lookup us':>10}")
+    runs = [(path, True) for path in paths] + [(path, False) for path in paths if path.endswith(".vocab")]
+    for path, in_memory in runs:
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", path,
+             "--probes", str(probes), "--seed", str(seed)] + ([] if in_memory else ["--mmap"]),
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{os.path.basename(r['path']):<28} {r['load_ms']:>9.1f} {r['anon_mb']:>11.1f} "
+              f"{r['file_mb']:>10.1f} {r['lookup_us']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare corpus formats at startup.")
+    parser.add_argument('--pickle', type=str, default='app/customCorpus.pkl', help='Pickled corpus set')
+    parser.add_argument('--vocab', type=str, default='app/customCorpus.vocab', help='Memory-mapped vocabulary file')
+    parser.add_argument('--probes', type=int, default=100000, help='Membership checks to time')
+    parser.add_argument('--seed', type=int, default=13, help='Random seed for probe words')
+    parser.add_argument('--worker', type=str, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--mmap', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, not args.mmap, args.probes, args.seed)))
+    else:
+        main([args.pickle, args.vocab], args.probes, args.seed)
@@ -0,0 +1,79 @@
+"""Per-worker RSS/PSS/USS of the preforked gunicorn server, and how many workers fit on this host.
+
+Starts gunicorn with gunicorn.conf.py, waits for /readyz, sends warm-up
+requests so every worker has run the model, then reads /proc of the master and
+its workers. USS is what each extra worker costs; PSS sums to the real total.
+
+Usage:
+    python benchmarks/bench_worker_memory.py --workers 2 --requests 50
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from memoryReport import available_memory, child_pids, process_memory  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SAMPLE = "GAF 418BB is a commercial roofing accessory product with manufacturer ID 418BB."
+
+
+def wait_ready(url, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/readyz", timeout=5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def main(workers, requests, port, timeout):
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, GUNICORN_WORKERS=str(workers), GUNICORN_BIND=f"127.0.0.1:{port}")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"], cwd=ROOT, env=env)
+    try:
+        if not wait_ready(url, timeout):
+            raise SystemExit("Server did not become ready")
+        for i in range(requests):
+            # Vary the text so the NER result cache does not answer everything
+            data = urllib.parse.urlencode({"text": f"{SAMPLE} Batch {i}.", "spellcheck": "on"}).encode()
+            urllib.request.urlopen(urllib.request.Request(f"{url}/", data=data), timeout=60).read()
+
+        rows = [("master", server.pid, process_memory(server.pid))]
+        rows += [("worker", pid, process_memory(pid)) for pid in child_pids(server.pid)]
+        print(f"{'process':<8} {'pid':>7} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8} {'shared MB':>10}")
+        for name, pid, memory in rows:
+            print(f"{name:<8} {pid:>7} {memory['rss'] / 1e6:>8.1f} {memory['pss'] / 1e6:>8.1f} "
+                  f"{memory['uss'] / 1e6:>8.1f} {memory['shared'] / 1e6:>10.1f}")
+        worker_rows = [memory for name, _, memory in rows if name == "worker"]
+        total_pss = sum(memory["pss"] for _, _, memory in rows)
+        print(f"Total (sum of PSS): {total_pss / 1e6:.1f}MB; naive sum of RSS: "
+              f"{sum(memory['rss'] for _, _, memory in rows) / 1e6:.1f}MB")
+        if worker_rows:
+            uss = max(memory["uss"] for memory in worker_rows)
+            free = available_memory() or 0
+            print(f"Each extra worker costs ~{uss / 1e6:.1f}MB (max worker USS); "
+                  f"{free / 1e6:.0f}MB available -> room for ~{int(free // uss)} more workers")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-worker memory of the preforked server.")
+    parser.add_argument('--workers', type=int, default=2, help='Number of gunicorn workers')
+    parser.add_argument('--requests', type=int, default=50, help='Warm-up requests before measuring')
+    parser.add_argument('--port', type=int, default=5055, help='Port to bind')
+    parser.add_argument('--timeout', type=int, default=300, help='Seconds to wait for readiness')
+    args = parser.parse_args()
+    main(args.workers, args.requests, args.port, args.timeout)
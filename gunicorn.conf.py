@@ -0,0 +1,75 @@
+"""Production server configuration: gunicorn -c gunicorn.conf.py
+
+The app (spaCy model, spell corpus, delete index, language model) is loaded once
+in the master with preload_app, the heap is frozen with gc.freeze(), and the
+workers are forked afterwards so they share those pages copy-on-write.
+"""
+import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from admissionControl import ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE  # noqa: E402
+from memoryReport import available_cores, available_memory, process_memory  # noqa: E402
+
+# Load synchronously in the master; a background loader thread would not survive the fork
+os.environ.setdefault("NER_BACKGROUND_LOAD", "0")
+# Workers log to stderr: a size-rotated file shared by several processes loses or duplicates lines on rollover
+os.environ.setdefault("LOG_FILE", "-")
+
+# Private memory a worker accumulates after the fork (activations, request data, caches)
+WORKER_MEMORY_MB = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", 700))
+# Memory kept free for the master and the OS
+HEADROOM_MB = int(os.environ.get("GUNICORN_HEADROOM_MB", 512))
+
+
+def worker_count():
+    """Workers to fork: GUNICORN_WORKERS if set, else one per core as far as memory allows."""
+    if os.environ.get("GUNICORN_WORKERS"):
+        return max(1, int(os.environ["GUNICORN_WORKERS"]))
+    cores = available_cores()
+    available = available_memory()
+    if available is None:
+        return cores
+    by_memory = (available // (1024 * 1024) - HEADROOM_MB) // WORKER_MEMORY_MB
+    return max(1, min(cores, by_memory))
+
+
+wsgi_app = "main:app"
+pythonpath = "app"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+preload_app = True
+workers = worker_count()
+# Several request threads per worker let the NER micro-batcher coalesce concurrent requests.
+# More threads than ADMISSION_MAX_IN_FLIGHT + ADMISSION_MAX_QUEUE, so excess requests reach
+# admission control and get a fast 429 instead of waiting unseen in the accept backlog
+threads = int(os.environ.get("GUNICORN_THREADS", ADMISSION_MAX_IN_FLIGHT + ADMISSION_MAX_QUEUE + 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+# Optional worker recycling; a fresh fork shares the master's frozen pages again
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+
+def _format_memory(memory):
+    return ", ".join(f"{name} {value / 1e6:.1f}MB" for name, value in memory.items())
+
+
+def when_ready(server):
+    """After the app is preloaded and before any fork: move everything into the permanent GC generation."""
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Froze {gc.get_freeze_count()} objects; master memory: {_format_memory(process_memory())}")
+    server.log.info(f"Starting {workers} workers x {threads} threads "
+                    f"({available_cores()} cores, {(available_memory() or 0) / 1e9:.1f}GB available)")
+
+
+def post_fork(server, worker):
+    """Split the cores between workers so torch thread pools do not oversubscribe them."""
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(max(1, available_cores() // workers))
+
+
+def post_worker_init(worker):
+    worker.log.info(f"Worker {worker.pid} ready; memory: {_format_memory(process_memory())}")
@@ -0,0 +1,139 @@
+"""Mine recurring misspellings from traffic and catalog text into a frozen correction table.
+
+Every distinct out-of-vocabulary word is run through the full corrector once and
+the result is stored in app/corrections.json, which spellCorrector checks in O(1)
+before any fuzzy search. Re-running with an existing table only resolves tokens
+that are not in it yet, unless the corpus has changed.
+
+Usage:
+    python spellcheck/build_correction_table.py \
+        --logs logs/main.log --replay requests.jsonl --catalog output/spacy_training_data.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+import spellCorrector  # noqa: E402
+from correctionTable import CorrectionTable  # noqa: E402
+from spellCorrector import TOKEN_WORD, classify_token, is_valid_word, suggest_word  # noqa: E402
+
+LOG_MARKER = "Input text: "
+
+
+def texts_from_logs(path):
+    """Yield the input texts logged by app/main.py (JSON lines or the older plain-text lines)."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("{"):
+                try:
+                    line = json.loads(line).get("message", "")
+                except (json.JSONDecodeError, AttributeError):
+                    continue
+            _, marker, payload = line.partition(LOG_MARKER)
+            if marker:
+                try:
+                    yield json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+
+
+def texts_from_replay(path):
+    """Yield texts from a JSON-lines replay file (fields: text, texts, body or article)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record.get("texts"), list):
+                yield from (t for t in record["texts"] if isinstance(t, str))
+            for field in ("text", "body", "article"):
+                if isinstance(record.get(field), str):
+                    yield record[field]
+                    break
+
+
+def texts_from_catalog(path, column):
+    """Yield a text column from a catalog CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row[column]
+
+
+def oov_words(texts):
+    """Count the lowercase cores of word tokens that are not in the corpus."""
+    counts = Counter()
+    for text in texts:
+        for token in text.split():
+            token_class = classify_token(token)
+            if token_class.kind == TOKEN_WORD and not is_valid_word(token_class.core):
+                counts[token_class.core.lower()] += 1
+    return counts
+
+
+def coverage(table_entries, live_counts):
+    """Fraction of live OOV token occurrences the table answers directly."""
+    total = sum(live_counts.values())
+    answered = sum(count for word, count in live_counts.items() if word in table_entries)
+    return answered / total if total else 0.0
+
+
+def main(args):
+    if not spellCorrector.load_corpus(args.corpus, index_path=args.index, engine=args.engine):
+        raise SystemExit(f"Could not load corpus {args.corpus}")
+    corpus_size = len(spellCorrector.CUSTOM_CORPUS)
+
+    live_counts = Counter()
+    for path in args.logs or []:
+        live_counts.update(oov_words(texts_from_logs(path)))
+    for path in args.replay or []:
+        live_counts.update(oov_words(texts_from_replay(path)))
+    catalog_counts = Counter()
+    for path in args.catalog or []:
+        catalog_counts.update(oov_words(texts_from_catalog(path, args.column)))
+    logging.info(f"{len(live_counts)} distinct OOV words from traffic, {len(catalog_counts)} from catalog")
+
+    existing = CorrectionTable.load(args.out, corpus_size=corpus_size) if not args.rebuild else None
+    entries = dict(existing.entries) if existing is not None else {}
+    coverage_before = coverage(entries, live_counts)
+
+    pending = [w for w, _ in (live_counts + catalog_counts).most_common()
+               if w not in entries and (live_counts[w] + catalog_counts[w]) >= args.min_count]
+    start = time.perf_counter()
+    for i, word in enumerate(pending, 1):
+        entries[word] = suggest_word(word)
+        if i % 500 == 0:
+            logging.info(f"Resolved {i}/{len(pending)} words...")
+    elapsed = time.perf_counter() - start
+
+    CorrectionTable(entries, corpus_size).save(args.out)
+    corrected = sum(1 for word, fix in entries.items() if fix != word)
+    print(f"Resolved {len(pending)} new words in {elapsed:.1f}s; table has {len(entries)} entries "
+          f"({corrected} with a correction) -> {args.out}")
+    if live_counts:
+        print(f"Coverage of live OOV tokens: {coverage_before:.1%} before, "
+              f"{coverage(entries, live_counts):.1%} after")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or refresh the precompiled correction table.")
+    parser.add_argument('--logs', nargs='*', default=['logs/main.log'], help='app/main.py log files')
+    parser.add_argument('--replay', nargs='*', default=[], help='JSON-lines replay files of requests')
+    parser.add_argument('--catalog', nargs='*', default=[], help='Catalog CSV files')
+    parser.add_argument('--column', type=str, default='article', help='Text column of the catalog CSVs')
+    parser.add_argument('--corpus', type=str, default='app/customCorpus.vocab', help='Spell corpus')
+    parser.add_argument('--index', type=str, default=None, help='Optional prebuilt engine index')
+    parser.add_argument('--engine', type=str, default=None, help='Correction engine name')
+    parser.add_argument('--out', type=str, default='app/corrections.json', help='Correction table path')
+    parser.add_argument('--min_count', type=int, default=1, help='Only store words seen at least this often')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore the existing table and resolve everything')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main(args)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# The app modules import each other by their flat names, as when run from app/
+sys.path.insert(0, os.path.join(REPO_DIR, "app"))
+
+
+@pytest.fixture(scope="session")
+def main_module(tmp_path_factory):
+    """
+    app/main.py loaded synchronously against a small entity_ruler pipeline.
+
+    The real corpus is used (main.py loads it relative to the repository root),
+    with the ngram engine so the suite does not build the delete index.
+    """
+    pytest.importorskip("flask")
+    spacy = pytest.importorskip("spacy")
+    model_path = tmp_path_factory.mktemp("ruler_model")
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "PRODUCT", "pattern": "cedar shingle"},
+        {"label": "COLOR", "pattern": "white"},
+    ])
+    nlp.to_disk(model_path)
+
+    patch = pytest.MonkeyPatch()
+    patch.setenv("NER_MODEL_PATH", str(model_path))
+    patch.setenv("NER_COMPONENTS", "entity_ruler")
+    patch.setenv("NER_BACKGROUND_LOAD", "0")
+    patch.setenv("SPELL_ENGINE", "ngram")
+    patch.chdir(REPO_DIR)
+    # ner and spellEngines read their environment at import; other tests may have imported them already
+    for name in ("ner", "spellEngines", "spellCorrector"):
+        patch.delitem(sys.modules, name, raising=False)
+    # main.py configures logging at import; configured here first, its call is a no-op
+    from logPipeline import configure_logging
+    configure_logging(str(tmp_path_factory.mktemp("logs") / "main.log"))
+    import main
+    assert main.STARTUP["state"] == "ready", main.STARTUP["error"]
+    yield main
+    patch.undo()
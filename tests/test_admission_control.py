@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from admissionControl import AdmissionController, DeadlineExceeded, Rejected, check_deadline, request_deadline
+from microBatcher import MicroBatcher
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    with controller.admit():
+        with pytest.raises(Rejected) as rejected:
+            with controller.admit():
+                pass
+    assert rejected.value.status == 429 and rejected.value.retry_after == 1
+
+
+@pytest.mark.parametrize("queue_timeout_ms, deadline_ms", [(50, None), (10000, 50)])
+def test_waiting_past_the_timeout_or_deadline_is_rejected_with_503(queue_timeout_ms, deadline_ms):
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_ms=queue_timeout_ms)
+    deadline = None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+    start = time.monotonic()
+    with controller.admit():
+        with pytest.raises(Rejected) as rejected:
+            with controller.admit(deadline):
+                pass
+    assert rejected.value.status == 503
+    assert time.monotonic() - start < 5
+    assert controller.waiting == 0 and controller.in_flight == 0
+
+
+def test_slot_is_released_when_the_request_raises():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    with pytest.raises(ValueError):
+        with controller.admit():
+            raise ValueError("inference failed")
+    assert controller.in_flight == 0
+    with controller.admit():
+        assert controller.in_flight == 1
+
+
+def test_waiter_gets_the_slot_of_a_failed_request():
+    controller = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_ms=5000)
+    holding, admitted = threading.Event(), []
+
+    def holder():
+        try:
+            with controller.admit():
+                holding.set()
+                while not controller.saturated():
+                    time.sleep(0.001)
+                raise RuntimeError("inference failed")
+        except RuntimeError:
+            pass
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    holding.wait(timeout=5)
+    with controller.admit():
+        admitted.append(controller.in_flight)
+    thread.join(timeout=5)
+    assert admitted == [1] and controller.in_flight == 0 and not controller.saturated()
+
+
+def test_request_deadline_header():
+    now = time.monotonic()
+    assert request_deadline("250") - now == pytest.approx(0.25, abs=0.05)
+    # The header can only shorten the default budget; junk is ignored
+    assert request_deadline("1e12") == pytest.approx(request_deadline(None), abs=0.05)
+    assert request_deadline("soon") == pytest.approx(request_deadline(None), abs=0.05)
+    with pytest.raises(DeadlineExceeded):
+        check_deadline(request_deadline("0"), "ner")
+    check_deadline(None, "ner")
+
+
+def test_batcher_drops_items_whose_deadline_passed_in_the_queue():
+    release, processed = threading.Event(), []
+
+    def extractor(items):
+        processed.extend(items)
+        release.wait(timeout=5)
+        return items
+
+    batcher = MicroBatcher(extractor, max_size=1, max_wait_ms=0)
+    blocking = batcher.submit("first")
+    while not processed:
+        time.sleep(0.001)
+    # The worker is busy with "first"; "late" is still queued when its deadline passes
+    with pytest.raises(TimeoutError):
+        batcher("late", deadline=time.monotonic() + 0.05)
+    release.set()
+    assert blocking.result(timeout=5) == "first"
+    assert batcher("next") == "next"
+    assert processed == ["first", "next"]
+    assert batcher.stats()["expired"] == 1
+
+
+def test_batcher_fails_an_already_expired_item_without_processing_it():
+    processed = []
+    batcher = MicroBatcher(lambda items: processed.extend(items) or items, max_size=4, max_wait_ms=0)
+    future = batcher.submit("expired", deadline=time.monotonic() - 1)
+    with pytest.raises(TimeoutError):
+        future.result(timeout=5)
+    assert processed == [] and batcher.stats()["expired"] == 1
+
+
+@pytest.fixture
+def client(main_module):
+    return main_module.app.test_client()
+
+
+@pytest.mark.parametrize("max_queue, status", [(0, 429), (1, 503)])
+def test_api_sheds_with_retry_after_when_full(main_module, client, monkeypatch, max_queue, status):
+    controller = AdmissionController(max_in_flight=1, max_queue=max_queue, queue_timeout_ms=50)
+    monkeypatch.setattr(main_module, "ADMISSION", controller)
+    with controller.admit():
+        response = client.post("/api/v1/extract", json={"texts": ["cedar shingle shed"]})
+    assert response.status_code == status
+    assert response.headers["Retry-After"] == "1"
+    assert "error" in response.get_json()
+    assert client.post("/api/v1/extract", json={"texts": ["cedar shingle shed"]}).status_code == 200
+
+
+def test_api_request_past_its_deadline_gets_503(client):
+    response = client.post("/api/v1/extract", json={"texts": ["cedar deadline"]},
+                           headers={"X-Request-Deadline-Ms": "0"})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "1"
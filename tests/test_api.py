@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def client(main_module):
+    return main_module.app.test_client()
+
+
+@pytest.fixture
+def windowed_calls(main_module, monkeypatch):
+    """Record the texts sent down the windowed NER path (with a 12-token window)."""
+    ner = main_module.RESOURCES["ner"]
+    calls = []
+    windowed = ner.extract_entities_windowed
+
+    def spy(text, nlp, **kwargs):
+        calls.append(text)
+        return windowed(text, nlp, window=12, overlap=4)
+
+    monkeypatch.setattr(ner, "MAX_WINDOW_TOKENS", 12)
+    monkeypatch.setattr(ner, "extract_entities_windowed", spy)
+    return calls
+
+
+# Two whitespace-separated words but 23 spaCy tokens (commas between letters are split off)
+PUNCTUATED = ",".join("abcdefghijk") + " white"
+
+
+def test_batch_routes_by_spacy_tokens(main_module, client, windowed_calls):
+    short = "cedar shingle route check"
+    response = client.post("/api/v1/extract", json={"texts": [PUNCTUATED, short]})
+    assert response.status_code == 200
+    assert windowed_calls == [PUNCTUATED]
+    results = response.get_json()["results"]
+    assert [e["label"] for e in results[0]["entities"]] == ["COLOR"]
+    assert [e["text"] for e in results[1]["entities"]] == ["cedar shingle"]
+
+
+def test_single_text_routes_by_spacy_tokens(main_module, client, windowed_calls):
+    batcher = main_module.RESOURCES["batcher"]
+    items = batcher.stats()["items"]
+    assert client.post("/", data={"text": "cedar shingle single route"}).status_code == 200
+    assert windowed_calls == [] and batcher.stats()["items"] == items + 1
+    text = PUNCTUATED + " single route"
+    assert client.post("/", data={"text": text}).status_code == 200
+    assert windowed_calls == [text] and batcher.stats()["items"] == items + 1
+
+
+def test_stream_rejects_over_long_texts(main_module, client, monkeypatch):
+    monkeypatch.setattr(main_module, "API_MAX_TEXT_CHARS", 50)
+    body = b'{"text": "cedar shingle stream"}\n{"text": "%s"}\n{"text": "white stream"}\n' % (b"x" * 500)
+    response = client.post("/api/v1/extract/stream", data=body)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.status_code == 200
+    # Errors are written at once, results when their batch finishes
+    assert lines[0] == {"line": 2, "error": "Texts are limited to 50 characters"}
+    assert [line["id"] for line in lines[1:]] == [1, 3]
+
+
+@pytest.fixture
+def profiler(main_module, tmp_path, monkeypatch):
+    from requestProfiler import RequestProfiler
+
+    profiler = RequestProfiler(directory=str(tmp_path), admin_token="secret")
+    monkeypatch.setattr(main_module, "PROFILER", profiler)
+    return profiler
+
+
+def test_stream_is_profiled_until_closed(main_module, client, profiler):
+    body = b"".join(b'{"text": "cedar shingle profiled %d"}\n' % i for i in range(3))
+    response = client.post("/api/v1/extract/stream", data=body,
+                           headers={"X-Profile": "1", "X-Admin-Token": "secret"})
+    profile_id = response.headers["X-Profile-Id"]
+    assert len(response.get_data(as_text=True).splitlines()) == 3
+    response.close()
+    assert profiler.list() == [profile_id]
+    assert "analyze_texts" in profiler.summary(profile_id)
+
+
+def test_probes_are_not_sampled(main_module, client, profiler):
+    profiler.sample_rate = 1.0
+    for path in ("/healthz", "/readyz", "/metrics"):
+        assert "X-Profile-Id" not in client.get(path).headers
+    assert profiler.list() == []
+    assert "X-Profile-Id" in client.get("/stats/spellcheck").headers
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"not json", 'Expected a JSON object with a "texts" array'),
+    (b'["cedar"]', 'Expected a JSON object with a "texts" array'),
+    (b'{"texts": "cedar"}', 'Expected a JSON object with a "texts" array'),
+    (b'{"texts": ["cedar"], "spellcheck": "yes"}', '"spellcheck" must be a boolean'),
+    (b'{"texts": ["cedar", 3]}', 'Every item of "texts" must be a string'),
+])
+def test_extract_rejects_invalid_input(client, body, message):
+    response = client.post("/api/v1/extract", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": message}
+
+
+@pytest.mark.parametrize("limit, value, payload", [
+    ("API_MAX_TEXTS", 2, {"texts": ["a", "b", "c"]}),
+    ("API_MAX_TEXT_CHARS", 10, {"texts": ["cedar", "cedar shingle roof"]}),
+    ("API_MAX_PAYLOAD_BYTES", 20, {"texts": ["cedar shingle roof"]}),
+])
+def test_extract_limits(main_module, client, monkeypatch, limit, value, payload):
+    monkeypatch.setattr(main_module, limit, value)
+    response = client.post("/api/v1/extract", json=payload)
+    assert response.status_code == 413
+    assert str(value) in response.get_json()["error"]
+
+
+def test_extract_response_shape(client):
+    texts = ["White  cedar shingle shape", "", "plain words shape"]
+    response = client.post("/api/v1/extract", json={"texts": texts})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body) == {"results", "timing_ms"}
+    assert set(body["timing_ms"]) == {"spellcheck", "ner", "total"}
+    results = body["results"]
+    assert [r["text"] for r in results] == ["White cedar shingle shape", "", "plain words shape"]
+    assert results[0]["entities"] == [{"text": "cedar shingle", "label": "PRODUCT", "start": 6, "end": 19}]
+    assert results[1]["entities"] == [] and results[2]["entities"] == []
+    for result in results:
+        for ent in result["entities"]:
+            assert result["text"][ent["start"]:ent["end"]] == ent["text"]
+
+
+def test_extract_uses_the_result_cache(client):
+    texts = ["cedar shingle cached", "white cached"]
+    first = client.post("/api/v1/extract", json={"texts": texts}).get_json()["results"]
+    assert [r["cached"] for r in first] == [False, False]
+    # Normalized text is the cache key; spellcheck results are cached separately
+    second = client.post("/api/v1/extract", json={"texts": ["cedar  shingle cached ", "new cached"]})
+    assert [r["cached"] for r in second.get_json()["results"]] == [True, False]
+    assert second.get_json()["results"][0]["entities"] == first[0]["entities"]
+    spellchecked = client.post("/api/v1/extract", json={"texts": texts, "spellcheck": True})
+    assert [r["cached"] for r in spellchecked.get_json()["results"]] == [False, False]
+
+
+def test_extract_before_startup(main_module, client, monkeypatch):
+    monkeypatch.setitem(main_module.STARTUP, "state", "starting")
+    response = client.post("/api/v1/extract", json={"texts": ["cedar"]})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "5"
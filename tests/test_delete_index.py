@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from deleteIndex import DeleteIndex
+from test_edit_distance import osa_distance, random_word
+
+
+def brute_force(vocabulary, word, max_distance):
+    """Every vocabulary word within max_distance of word, by checking them all."""
+    found = {}
+    for candidate in vocabulary:
+        distance = osa_distance(word, candidate)
+        # Words without a common character are out of the index's contract (see DeleteIndex.candidates)
+        if distance <= max_distance and set(word) & set(candidate):
+            found[candidate] = distance
+    return found
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    rng = random.Random(7)
+    # A small alphabet makes near neighbours common; lengths cross the prefix length
+    return sorted({random_word(rng, alphabet="abcd", max_length=10) for _ in range(600)} - {""})
+
+
+@pytest.mark.parametrize("max_distance, prefix_length", [(1, 7), (2, 7), (2, 4)])
+def test_candidates_match_brute_force(vocabulary, max_distance, prefix_length):
+    index = DeleteIndex.build(vocabulary, max_distance=max_distance, prefix_length=prefix_length)
+    assert index.corpus_size == len(vocabulary)
+    rng = random.Random(max_distance * 10 + prefix_length)
+    queries = [random_word(rng, alphabet="abcde", max_length=11) for _ in range(150)]
+    queries += rng.sample(vocabulary, 30)
+    for query in queries:
+        if query:
+            assert index.candidates(query) == brute_force(vocabulary, query, max_distance), query
+
+
+def test_lookup_ranks_closest_first():
+    index = DeleteIndex.build(["board", "bard", "boards", "cedar", "shingles"])
+    assert index.lookup("shingels") == ["shingles"]
+    assert index.lookup("cedr") == ["cedar"]
+    assert index.lookup("zzzzzz") == []
+    assert index.lookup("boardx", n=2) == ["board", "boards"]
+
+
+def test_save_and_load_round_trip(tmp_path, vocabulary):
+    index = DeleteIndex.build(vocabulary)
+    path = str(tmp_path / "corpus.index")
+    index.save(path)
+    loaded = DeleteIndex.load(path, len(vocabulary))
+    assert loaded is not None
+    assert DeleteIndex.load(path, len(vocabulary) + 1) is None
+    assert DeleteIndex.load(str(tmp_path / "missing.index")) is None
+    for query in ("abcab", "dddd", "abcdabcdab"):
+        assert loaded.candidates(query) == index.candidates(query)
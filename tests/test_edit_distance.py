@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from editDistance import bounded_distance, rank_candidates
+
+
+def osa_distance(source, target):
+    """Reference optimal string alignment distance: the full DP matrix, no band, no early exit."""
+    d = [[0] * (len(target) + 1) for _ in range(len(source) + 1)]
+    for i in range(len(source) + 1):
+        d[i][0] = i
+    for j in range(len(target) + 1):
+        d[0][j] = j
+    for i in range(1, len(source) + 1):
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(source)][len(target)]
+
+
+def random_word(rng, alphabet="abcde", max_length=9):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_length)))
+
+
+@pytest.mark.parametrize("source, target, expected", [
+    ("", "", 0),
+    ("", "abc", 3),
+    ("board", "board", 0),
+    ("baord", "board", 1),    # transposition
+    ("bord", "board", 1),     # insertion
+    ("boards", "board", 1),   # deletion
+    ("boarx", "board", 1),    # substitution
+    ("ca", "abc", 3),         # OSA, not Damerau: no edit after a transposition
+    ("shingels", "shingles", 1),
+])
+def test_known_distances(source, target, expected):
+    assert osa_distance(source, target) == expected
+    assert bounded_distance(source, target, 3) == min(expected, 4)
+
+
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3])
+def test_matches_reference(max_distance):
+    rng = random.Random(max_distance)
+    for _ in range(3000):
+        source, target = random_word(rng), random_word(rng)
+        expected = osa_distance(source, target)
+        result = bounded_distance(source, target, max_distance)
+        if expected <= max_distance:
+            assert result == expected, (source, target)
+        else:
+            assert result == max_distance + 1, (source, target)
+
+
+def test_rank_candidates_orders_by_distance_then_similarity():
+    # Equal distances fall back to difflib's ratio, which prefers "bard" (0.89) to "board" (0.8);
+    # "xyz" is below the cutoff
+    found = {"bard": 1, "board": 1, "bored": 2, "xyz": 1}
+    assert rank_candidates("baord", found, n=3) == ["bard", "board", "bored"]
+    assert rank_candidates("baord", {"board": 1, "bar": 2}, n=1) == ["board"]
+    assert rank_candidates("baord", {}, n=1) == []
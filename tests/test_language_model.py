@@ -0,0 +1,21 @@
+from languageModel import TrigramLanguageModel, normalize_token, tokenize
+
+
+def _model():
+    sentences = [tokenize("pvc trim board white")] * 5 + [tokenize("the bard sings")]
+    return TrigramLanguageModel.train(sentences)
+
+
+def test_normalize_token_strips_punctuation():
+    assert normalize_token("Board,") == "board"
+    assert normalize_token("(2x4)") == "2x4"
+    assert normalize_token("--") == ""
+
+
+def test_best_candidate_uses_context():
+    assert _model().best_candidate(["pvc", "trim"], ["bard", "board"], ["white"]) == "board"
+
+
+def test_best_candidate_scores_candidates_with_punctuation():
+    # Candidates keep the token's punctuation; the score must not
+    assert _model().best_candidate(["pvc", "trim"], ["bard,", "board,"], ["white"]) == "board,"
@@ -0,0 +1,158 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from logPipeline import (DROPPED, DroppingQueueHandler, JsonFormatter, LazyJson, RateLimitFilter,
+                         reset_request_id, set_request_id)
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+class CaptureHandler(logging.Handler):
+    """Keeps each formatted record and the thread that formatted it."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines, self.threads = [], []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+
+@pytest.fixture
+def pipeline():
+    """A logger routed through a DroppingQueueHandler to a QueueListener writing into a CaptureHandler."""
+    log_queue = queue.Queue()
+    capture = CaptureHandler()
+    listener = logging.handlers.QueueListener(log_queue, capture)
+    logger = logging.getLogger("tests.log_pipeline")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = DroppingQueueHandler(log_queue)
+    logger.addHandler(handler)
+    listener.start()
+    yield logger, listener, capture
+    logger.removeHandler(handler)
+    if listener._thread is not None:
+        listener.stop()
+
+
+def test_records_are_written_as_json_on_the_writer_thread(pipeline):
+    logger, listener, capture = pipeline
+    token = set_request_id("req-1")
+    try:
+        logger.info("Processed %d texts", 3, extra={"status": 200})
+    finally:
+        reset_request_id(token)
+    logger.warning("No request")
+    listener.stop()
+    entries = [json.loads(line) for line in capture.lines]
+    assert [e["message"] for e in entries] == ["Processed 3 texts", "No request"]
+    assert entries[0]["request_id"] == "req-1" and entries[0]["status"] == 200
+    assert "request_id" not in entries[1]
+    assert entries[1]["level"] == "WARNING" and entries[1]["pid"] == os.getpid()
+    assert all(thread is not threading.current_thread() for thread in capture.threads)
+
+
+def test_mutable_arguments_are_formatted_at_the_call(pipeline):
+    logger, listener, capture = pipeline
+    words = ["cedar"]
+    logger.info("Words: %s, text: %s", words, LazyJson({"text": "shingle"}))
+    words.append("shingle")
+    listener.stop()
+    assert json.loads(capture.lines[0])["message"] == 'Words: [\'cedar\'], text: {"text": "shingle"}'
+
+
+def test_lazy_json_is_rendered_on_the_writer_thread():
+    rendered_on = []
+
+    class Probe(LazyJson):
+        __slots__ = ()
+
+        def __str__(self):
+            rendered_on.append(threading.current_thread())
+            return super().__str__()
+
+    handler = DroppingQueueHandler(queue.Queue())
+    record = logging.LogRecord("tests", logging.INFO, __file__, 1, "Input text: %s", (Probe("cedar"),), None)
+    handler.handle(record)
+    queued = handler.queue.get_nowait()
+    assert rendered_on == [] and isinstance(queued.args[0], Probe)
+    assert queued.getMessage() == 'Input text: "cedar"'
+
+
+def test_full_queue_drops_records_without_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("tests.log_pipeline.full")
+    logger.propagate = False
+    logger.addHandler(handler)
+    dropped = DROPPED._values.get((), 0)
+    try:
+        start = time.perf_counter()
+        for i in range(5):
+            logger.warning("record %d", i)
+        assert time.perf_counter() - start < 1
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert DROPPED._values.get((), 0) - dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["record 0", "record 1"]
+
+
+def test_rate_limit_filter_suppresses_and_reports():
+    limiter = RateLimitFilter(rate=2)
+    records = [logging.LogRecord("tests.tokens", logging.INFO, __file__, 1, "token", None, None) for _ in range(5)]
+    assert [limiter.filter(record) for record in records] == [True, True, False, False, False]
+    limiter.tokens, limiter.updated = 1, time.monotonic()
+    record = logging.LogRecord("tests.tokens", logging.INFO, __file__, 1, "token", None, None)
+    assert limiter.filter(record) and record.suppressed == 3
+
+
+def _run_app_script(script, log_file, **env):
+    """Run a script with app/ on the path and logging configured to log_file; return its log entries."""
+    environ = dict(os.environ, LOG_FILE=str(log_file), LOG_FORMAT="json", LOG_LEVEL="INFO", **env)
+    subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, env=environ, check=True, timeout=60)
+    with open(log_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_queued_records_are_flushed_at_exit(tmp_path):
+    script = (
+        "import logging\n"
+        "from logPipeline import configure_logging\n"
+        "configure_logging()\n"
+        "for i in range(2000):\n"
+        "    logging.info('record %d', i)\n"
+    )
+    entries = _run_app_script(script, tmp_path / "main.log")
+    assert [e["message"] for e in entries] == [f"record {i}" for i in range(2000)]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_child_gets_its_own_writer(tmp_path):
+    script = (
+        "import logging, os, sys\n"
+        "from logPipeline import configure_logging\n"
+        "configure_logging()\n"
+        "logging.info('parent before fork')\n"
+        "pid = os.fork()\n"
+        "if pid == 0:\n"
+        "    logging.info('child')\n"
+        "    sys.exit(0)\n"
+        "os.waitpid(pid, 0)\n"
+        "logging.info('parent after fork')\n"
+    )
+    entries = _run_app_script(script, tmp_path / "main.log")
+    messages = sorted(e["message"] for e in entries)
+    assert messages == ["child", "parent after fork", "parent before fork"]
+    assert len({e["pid"] for e in entries}) == 2
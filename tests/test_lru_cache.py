@@ -0,0 +1,59 @@
+import lruCache
+from lruCache import ByteLRUCache, LRUCache, approx_size
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 1, 1)
+
+
+def test_lru_overwrite_and_zero_size():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("a", 2)
+    assert cache.get("a") == 2 and len(cache) == 1
+    disabled = LRUCache(maxsize=0)
+    disabled.put("a", 1)
+    assert disabled.get("a", "miss") == "miss"
+
+
+def test_byte_budget_is_enforced():
+    cache = ByteLRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")   # 5 bytes
+    cache.put("b", "yyyy")   # 10 bytes in total
+    assert cache.bytes == 10 and len(cache) == 2
+    cache.put("c", "zz")     # 13 > 10: "a" is evicted
+    assert cache.get("a") is None
+    assert cache.bytes == 8 and cache.stats()["evictions"] == 1
+    cache.put("b", "y")      # overwriting adjusts the byte count
+    assert cache.bytes == 5
+    cache.put("big", "x" * 20)  # larger than the whole budget: not stored, nothing evicted
+    assert cache.get("big") is None and len(cache) == 2
+    cache.clear()
+    assert cache.bytes == 0 and len(cache) == 0
+
+
+def test_byte_cache_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lruCache.time, "monotonic", lambda: now[0])
+    cache = ByteLRUCache(max_bytes=1000, ttl=5)
+    cache.put("a", "value")
+    now[0] += 4
+    assert cache.get("a") == "value"
+    now[0] += 2
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["bytes"] == 0
+
+
+def test_approx_size_follows_containers():
+    assert approx_size(["abc", "def"]) > approx_size([])
+    assert approx_size({"k": ("a" * 100,)}) > 100
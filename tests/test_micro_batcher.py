@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from microBatcher import MicroBatcher
+
+
+class StubExtractor:
+    """Records each batch it is given and tags every item with its batch number."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [(item, len(self.batches)) for item in items]
+
+
+def test_concurrent_calls_are_coalesced():
+    extractor = StubExtractor()
+    # A batch closes as soon as it is full, so the long wait only bounds a slow start
+    batcher = MicroBatcher(extractor, max_size=8, max_wait_ms=5000)
+    results = {}
+
+    def call(i):
+        results[i] = batcher(f"text {i}")
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert len(extractor.batches) == 1
+    assert sorted(extractor.batches[0]) == sorted(f"text {i}" for i in range(8))
+    # Every caller gets the result for its own item
+    assert results == {i: (f"text {i}", 1) for i in range(8)}
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["items"] == 8 and stats["batch_sizes"] == {8: 1}
+
+
+def test_batches_are_capped_at_max_size():
+    extractor = StubExtractor()
+    batcher = MicroBatcher(extractor, max_size=3, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(7)]
+    assert [future.result(timeout=10)[0] for future in futures] == list(range(7))
+    # The last item waits out max_wait alone
+    assert extractor.batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_results_follow_submission_order_within_a_batch():
+    batcher = MicroBatcher(lambda items: [item * 10 for item in items], max_size=4, max_wait_ms=5000)
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [future.result(timeout=10) for future in futures] == [0, 10, 20, 30]
+
+
+def test_a_failed_batch_fails_each_caller():
+    def extractor(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(extractor, max_size=2, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failed"):
+            future.result(timeout=10)
+    assert batcher.stats()["failures"] == 1
+    # The worker survives the failure
+    batcher.process_batch = StubExtractor()
+    assert batcher(5) == (5, 1)
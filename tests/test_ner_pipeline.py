@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from spacy.training import Example  # noqa: E402
+
+from ner import (_skip_failed_batch, annotate_with_confidence, extract_entities,  # noqa: E402
+                 extract_entities_batch, extract_entities_cascade, load_fast_model, load_model)
+
+TRAIN = [
+    ("white cedar shingle roof", [(6, 19, "PRODUCT")]),
+    ("buy cedar shingle now", [(4, 17, "PRODUCT")]),
+    ("pine board and cedar shingle", [(15, 28, "PRODUCT")]),
+    ("a red brick wall", []),
+]
+TEXTS = ["old cedar shingle here", "", "a red brick wall", "cedar shingle"]
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    """A tiny pipeline with a trained (Cython) ner component, as the fast student is."""
+    random.seed(0)
+    spacy.util.fix_random_seed(0)
+    nlp = spacy.blank("en")
+    nlp.add_pipe("ner")
+    examples = [Example.from_dict(nlp.make_doc(text), {"entities": ents}) for text, ents in TRAIN]
+    optimizer = nlp.initialize(lambda: examples)
+    for _ in range(30):
+        random.shuffle(examples)
+        nlp.update(examples, sgd=optimizer, drop=0.0)
+    path = tmp_path_factory.mktemp("ner_model")
+    nlp.to_disk(path)
+    return str(path)
+
+
+def test_load_model_with_ner_component(model_path):
+    nlp = load_model(model_path)
+    assert nlp.pipe_names == ["ner"]
+    assert [(e["text"], e["label"]) for e in extract_entities("old cedar shingle here", nlp)] == \
+        [("cedar shingle", "PRODUCT")]
+
+
+def test_load_fast_model_with_ner_component(model_path):
+    assert load_fast_model(model_path).pipe_names == ["ner"]
+
+
+def test_batch_matches_single_documents(model_path):
+    nlp = load_model(model_path)
+    assert extract_entities_batch(TEXTS, nlp, batch_size=2) == [extract_entities(t, nlp) if t else [] for t in TEXTS]
+
+
+def test_batch_retries_documents_after_a_raising_component(model_path, monkeypatch):
+    nlp = load_model(model_path)
+    expected = extract_entities_batch(TEXTS, nlp)
+
+    def failing_pipe(*args, **kwargs):
+        raise RuntimeError("batch failed")
+        yield
+
+    monkeypatch.setattr(nlp, "pipe", failing_pipe)
+    assert extract_entities_batch(TEXTS, nlp) == expected
+
+
+def test_error_handlers_skip_components_that_cannot_take_one(model_path):
+    nlp = load_model(model_path)
+    nlp.add_pipe("entity_ruler", before="ner").add_patterns([{"label": "PRODUCT", "pattern": "pine board"}])
+    extract_entities_batch(["cedar shingle"], nlp)
+    assert nlp.get_pipe("entity_ruler").get_error_handler() is _skip_failed_batch
+
+
+@pytest.mark.parametrize("threshold, escalate", [(0.0, False), (1.1, True)])
+def test_cascade_with_trained_ner(model_path, threshold, escalate):
+    fast_nlp = load_fast_model(model_path)
+    nlp = load_model(model_path)
+    results, escalated = extract_entities_cascade(TEXTS, fast_nlp, nlp, threshold=threshold)
+    assert escalated == [bool(text) and escalate for text in TEXTS]
+    assert results == extract_entities_batch(TEXTS, nlp)
+
+
+def test_confidence_is_a_probability(model_path):
+    annotated = annotate_with_confidence([t for t in TEXTS if t], load_fast_model(model_path), batch_size=2)
+    assert [doc.text for doc, _ in annotated] == [t for t in TEXTS if t]
+    assert all(0.0 <= confidence <= 1.0 for _, confidence in annotated)
@@ -0,0 +1,112 @@
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from ner import _stitch_window_entities, extract_entities, extract_entities_windowed, token_windows  # noqa: E402
+
+# Token character offsets: aaa 0-3, bbb 4-7, ccc 8-11, ddd 12-15, eee 16-19, fff 20-23, ggg 24-27
+TEXT = "aaa bbb ccc ddd eee fff ggg"
+# token_windows(7, 5, 3) -> (0, 5), (2, 7): window 0 covers chars 0-19, window 1 chars 8-27.
+# Ownership switches at token (2 + 5) // 2 = 3, i.e. char 12
+W0 = (0, 19, 0, 12)
+W1 = (8, 27, 12, 27)
+
+
+def ent(start, end, label="PRODUCT", offset=0):
+    """An entity as returned by extract_entities for a window starting at char offset."""
+    return {"text": TEXT[start:end], "label": label, "start": start - offset, "end": end - offset}
+
+
+def spans(entities):
+    return [(e["start"], e["end"], e["label"]) for e in entities]
+
+
+def test_token_windows_cover_with_overlap():
+    assert token_windows(7, 5, 3) == [(0, 5), (2, 7)]
+    assert token_windows(5, 5, 3) == [(0, 5)]
+    windows = token_windows(1000, 256, 32)
+    assert windows[0][0] == 0 and windows[-1][1] == 1000
+    assert all(nxt[0] == cur[1] - 32 for cur, nxt in zip(windows, windows[1:]))
+
+
+@pytest.mark.parametrize("overlap", [0, -1, 5, 6])
+def test_token_windows_rejects_bad_overlap(overlap):
+    with pytest.raises(ValueError):
+        token_windows(20, 5, overlap)
+
+
+def test_entity_ending_at_interior_edge_is_taken_from_next_window():
+    # Window 0 sees "eee" at its right edge (end == char_end), possibly cut; window 1 sees "eee fff"
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(16, 19, offset=0)],),
+                                            W1 + ([ent(16, 23, offset=8)],)])
+    assert spans(result) == [(16, 23, "PRODUCT")]
+
+
+def test_entity_starting_at_interior_edge_is_taken_from_previous_window():
+    # Window 1 sees "ccc" at its left edge (start == char_start), possibly cut; window 0 sees "bbb ccc"
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(4, 11, offset=0)],),
+                                            W1 + ([ent(8, 11, offset=8)],)])
+    assert spans(result) == [(4, 11, "PRODUCT")]
+
+
+def test_outer_edges_are_kept():
+    # The start of the first window and the end of the last one are real text boundaries
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(0, 3, offset=0)],),
+                                            W1 + ([ent(24, 27, offset=8)],)])
+    assert spans(result) == [(0, 3, "PRODUCT"), (24, 27, "PRODUCT")]
+
+
+def test_overlap_duplicates_are_merged():
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(12, 15, offset=0)],),
+                                            W1 + ([ent(12, 15, offset=8)],)])
+    assert spans(result) == [(12, 15, "PRODUCT")]
+    assert result[0]["text"] == "ddd"
+
+
+def test_conflicts_prefer_the_owning_window():
+    # "ddd" starts at char 12, which window 1 owns
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(12, 15, "COLOR", offset=0)],),
+                                            W1 + ([ent(12, 15, "PRODUCT", offset=8)],)])
+    assert spans(result) == [(12, 15, "PRODUCT")]
+
+
+@pytest.fixture(scope="module")
+def ruler_nlp():
+    nlp = spacy.blank("en")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "PRODUCT", "pattern": "cedar shingle"},
+        {"label": "COLOR", "pattern": "white"},
+    ])
+    return nlp
+
+
+@pytest.mark.parametrize("window, overlap", [(8, 3), (7, 2), (5, 4), (5, 2), (5, 1), (4, 1)])
+def test_windowed_matches_single_pass(ruler_nlp, window, overlap):
+    # Entities land on every window boundary as the phrase shifts against the window grid
+    text = " ".join(["white cedar shingle board x"] * 6 + ["white cedar shingle"])
+    expected = extract_entities(text, ruler_nlp)
+    assert len(ruler_nlp.make_doc(text)) > window
+    assert extract_entities_windowed(text, ruler_nlp, window=window, overlap=overlap) == expected
+
+
+def test_entity_filling_the_overlap_is_kept(ruler_nlp):
+    # token_windows(11, 5, 2) -> (0, 5), (3, 8), (6, 11): "cedar shingle" is tokens 3-4, the whole
+    # overlap of the first two windows, so it touches an interior edge in both
+    text = "a b c cedar shingle x y z q r s"
+    expected = extract_entities(text, ruler_nlp)
+    assert spans(expected) == [(6, 19, "PRODUCT")]
+    assert extract_entities_windowed(text, ruler_nlp, window=5, overlap=2) == expected
+
+
+def test_one_token_entity_on_a_one_token_overlap_is_kept(ruler_nlp):
+    # token_windows(9, 5, 1) -> (0, 5), (4, 9): "white" is token 4, the only shared token
+    text = "a b c d white x y z q"
+    expected = extract_entities(text, ruler_nlp)
+    assert spans(expected) == [(8, 13, "COLOR")]
+    assert extract_entities_windowed(text, ruler_nlp, window=5, overlap=1) == expected
+
+
+def test_entity_at_both_interior_edges_is_kept():
+    # Window 0 sees "ccc ddd eee" ending at its right edge, window 1 sees it starting at its left edge
+    result = _stitch_window_entities(TEXT, [W0 + ([ent(8, 19, offset=0)],), W1 + ([ent(8, 19, offset=8)],)])
+    assert spans(result) == [(8, 19, "PRODUCT")]
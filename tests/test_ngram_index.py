@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from deleteIndex import DeleteIndex
+from ngramIndex import NgramIndex, _grams
+from test_delete_index import brute_force
+from test_edit_distance import random_word
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    rng = random.Random(11)
+    return sorted({random_word(rng, alphabet="abcd", max_length=10) for _ in range(600)} - {""})
+
+
+@pytest.mark.parametrize("max_distance", [1, 2])
+def test_candidate_recall(vocabulary, max_distance):
+    index = NgramIndex.build(vocabulary, max_distance=max_distance)
+    assert index.corpus_size == len(vocabulary)
+    rng = random.Random(max_distance)
+    queries = [random_word(rng, alphabet="abcde", max_length=11) for _ in range(150)] + rng.sample(vocabulary, 30)
+    for query in queries:
+        if not query:
+            continue
+        expected = brute_force(vocabulary, query, max_distance)
+        # Documented gap: words sharing no padded trigram with the query are never candidates
+        expected = {word: d for word, d in expected.items() if _grams(word) & _grams(query)}
+        assert index.candidates(query) == expected, query
+
+
+def test_differs_from_delete_index_only_on_words_without_shared_trigrams(vocabulary):
+    # The source of the rare top-1 disagreements between the two engines
+    ngram, delete = NgramIndex.build(vocabulary), DeleteIndex.build(vocabulary)
+    rng = random.Random(3)
+    for _ in range(150):
+        query = random_word(rng, alphabet="abcd", max_length=11)
+        if not query:
+            continue
+        from_ngram, from_delete = ngram.candidates(query), delete.candidates(query)
+        assert from_ngram.items() <= from_delete.items(), query
+        assert all(not _grams(word) & _grams(query) for word in from_delete.keys() - from_ngram.keys()), query
+
+
+def test_lookup():
+    index = NgramIndex.build(["board", "boards", "cedar", "shingles", "aluminum"])
+    assert index.lookup("shingels") == ["shingles"]
+    assert index.lookup("alumnum") == ["aluminum"]
+    assert index.lookup("qqqqqq") == []
+    assert NgramIndex.build([]).candidates("board") == {}
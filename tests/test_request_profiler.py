@@ -0,0 +1,29 @@
+from requestProfiler import RequestProfiler
+
+
+def test_authorised():
+    profiler = RequestProfiler(admin_token="sécret")
+    assert profiler.authorised({"X-Admin-Token": "sécret"})
+    assert not profiler.authorised({"X-Admin-Token": "secret"})
+    assert not profiler.authorised({})
+    assert not RequestProfiler(admin_token="").authorised({"X-Admin-Token": ""})
+
+
+def test_non_ascii_token_is_rejected_not_raised():
+    profiler = RequestProfiler(admin_token="secret")
+    assert not profiler.authorised({"X-Admin-Token": "sécret"})
+    assert not profiler.requested({"X-Profile": "1", "X-Admin-Token": "sécret"})
+
+
+def test_profile_ring(tmp_path):
+    profiler = RequestProfiler(directory=str(tmp_path), ring_size=2, admin_token="secret")
+    ids = []
+    for label in ("POST /", "POST /api/v1/extract", "GET /"):
+        running = profiler.start()
+        assert running is not None
+        sum(range(1000))
+        ids.append(profiler.stop(running, label))
+    assert len(profiler.list()) == 2
+    assert profiler.list()[0] == ids[-1]
+    assert profiler.summary(ids[-1]).startswith("GET /")
+    assert profiler.summary(ids[0]) is None
@@ -0,0 +1,16 @@
+import spellEngines
+from spellEngines import default_engine
+
+
+def test_default_engine_follows_the_prebuilt_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(spellEngines, "CONFIGURED_ENGINE", None)
+    index = tmp_path / "corpus.index"
+    assert default_engine(None) == "ngram"
+    assert default_engine(str(index)) == "ngram"
+    index.write_bytes(b"")
+    assert default_engine(str(index)) == "delete"
+
+
+def test_spell_engine_variable_wins(tmp_path, monkeypatch):
+    monkeypatch.setattr(spellEngines, "CONFIGURED_ENGINE", "delete")
+    assert default_engine(str(tmp_path / "missing.index")) == "delete"
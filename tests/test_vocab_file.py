@@ -0,0 +1,73 @@
+import pickle
+
+import pytest
+
+from vocabFile import MmapVocabulary, load_vocabulary, write_vocabulary
+
+WORDS = ["shingle", "board", "cedar", "aluminum", "café", "naïve", "board", "", "a"]
+
+
+@pytest.fixture
+def vocab_path(tmp_path):
+    path = str(tmp_path / "corpus.vocab")
+    assert write_vocabulary(WORDS, path) == 7  # duplicates and empty strings dropped
+    return path
+
+
+def test_round_trip(vocab_path):
+    vocabulary = MmapVocabulary(vocab_path)
+    try:
+        assert len(vocabulary) == 7
+        assert sorted(vocabulary) == sorted(set(WORDS) - {""})
+        for word in set(WORDS) - {""}:
+            assert word in vocabulary
+        for word in ("boards", "boar", "", "cafe", "zzz", "0"):
+            assert word not in vocabulary
+        assert 42 not in vocabulary
+    finally:
+        vocabulary.close()
+
+
+def test_words_sorted_bytewise(vocab_path):
+    vocabulary = MmapVocabulary(vocab_path)
+    try:
+        encoded = [vocabulary.word_bytes(i) for i in range(len(vocabulary))]
+        assert encoded == sorted(encoded)
+    finally:
+        vocabulary.close()
+
+
+def test_empty_vocabulary(tmp_path):
+    path = str(tmp_path / "empty.vocab")
+    write_vocabulary([], path)
+    vocabulary = MmapVocabulary(path)
+    assert len(vocabulary) == 0 and "a" not in vocabulary and list(vocabulary) == []
+    vocabulary.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.vocab"
+    path.write_bytes(b"NOTVOCAB" + bytes(16))
+    with pytest.raises(ValueError):
+        MmapVocabulary(str(path))
+
+
+@pytest.mark.parametrize("words", [WORDS, ["shingle", "board", "cedar"]])
+def test_to_set(tmp_path, words):
+    path = str(tmp_path / "corpus.vocab")
+    write_vocabulary(words, path)
+    vocabulary = MmapVocabulary(path)
+    try:
+        assert vocabulary.to_set() == frozenset(words) - {""}
+    finally:
+        vocabulary.close()
+
+
+def test_load_vocabulary_formats(tmp_path, vocab_path):
+    assert load_vocabulary(vocab_path) == frozenset(WORDS) - {""}
+    vocabulary = load_vocabulary(vocab_path, in_memory=False)
+    assert isinstance(vocabulary, MmapVocabulary)
+    vocabulary.close()
+    pickled = tmp_path / "corpus.pkl"
+    pickled.write_bytes(pickle.dumps({"board", "cedar"}))
+    assert load_vocabulary(str(pickled)) == {"board", "cedar"}
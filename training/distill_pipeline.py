@@ -0,0 +1,179 @@
+import argparse
+import logging
+import os
+import random
+import time
+
+import pandas as pd
+import spacy
+from spacy.tokens import DocBin
+from spacy.training import Example
+from spacy.util import compounding, minibatch
+
+
+def setup_logging(log_path='logs/distillPipeline.log'):
+    """Configure logging to file and console."""
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filename=log_path,
+        filemode='w'
+    )
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(levelname)s - %(message)s')
+    console.setFormatter(formatter)
+    logging.getLogger('').addHandler(console)
+
+def _text_key(text):
+    """Whitespace-insensitive form of a text, for matching unlabeled texts against the gold DocBins."""
+    return " ".join(text.split())
+
+def held_out_texts(docbin_paths):
+    """Texts of the gold evaluation DocBins, which must not reach the silver data."""
+    vocab = spacy.blank("en").vocab
+    return {_text_key(doc.text) for path in docbin_paths for doc in DocBin().from_disk(path).get_docs(vocab)}
+
+def load_unlabeled_texts(paths, column, exclude=frozenset()):
+    """Read unlabeled catalog text from CSV files (one column) or plain text files (one text per line), deduplicated,
+    dropping any text in exclude (see held_out_texts)."""
+    texts = []
+    for path in paths:
+        if path.endswith('.csv'):
+            texts.extend(pd.read_csv(path)[column].dropna().astype(str))
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts.extend(line.strip() for line in f)
+    unique = list(dict.fromkeys(t for t in texts if t.strip()))
+    kept = [t for t in unique if _text_key(t) not in exclude]
+    logging.info(f"Loaded {len(kept)} distinct unlabeled texts from {len(paths)} files "
+                 f"({len(unique) - len(kept)} dropped as dev/test texts).")
+    return kept
+
+def label_with_teacher(teacher, texts, filename, batch_size=16):
+    """Annotate texts with the teacher pipeline and save the silver entities as a DocBin."""
+    logging.info(f"Labelling {len(texts)} texts with the teacher...")
+    doc_bin = DocBin(attrs=["ENT_IOB", "ENT_TYPE"])
+    start = time.perf_counter()
+    for i, doc in enumerate(teacher.pipe(texts, batch_size=batch_size)):
+        doc_bin.add(doc)
+        if (i + 1) % 500 == 0:
+            logging.info(f"Labelled {i + 1} texts ({(i + 1) / (time.perf_counter() - start):.1f} docs/s)...")
+    doc_bin.to_disk(filename)
+    logging.info(f"Saved silver DocBin to {filename}.")
+
+def load_examples(nlp, docbin_paths):
+    """Build training examples (student tokenization vs. stored entities) from DocBins."""
+    examples = []
+    for path in docbin_paths:
+        for doc in DocBin().from_disk(path).get_docs(nlp.vocab):
+            examples.append(Example(nlp.make_doc(doc.text), doc))
+    return examples
+
+def train_student(train_examples, dev_examples, output_dir, epochs=20, patience=3, dropout=0.1, seed=0):
+    """Train a tok2vec/CNN NER student from spacy.blank("en") and save the best epoch by dev F1."""
+    spacy.util.fix_random_seed(seed)
+    nlp = spacy.blank("en")
+    # The default ner model embeds with its own HashEmbedCNN tok2vec: small and fast on CPU
+    nlp.add_pipe("ner")
+    optimizer = nlp.initialize(lambda: train_examples)
+    logging.info(f"Training student on {len(train_examples)} examples, "
+                 f"labels: {nlp.get_pipe('ner').labels}")
+
+    best_f, stale = -1.0, 0
+    for epoch in range(epochs):
+        random.shuffle(train_examples)
+        losses = {}
+        for batch in minibatch(train_examples, size=compounding(4.0, 32.0, 1.001)):
+            nlp.update(batch, drop=dropout, sgd=optimizer, losses=losses)
+        ents_f = nlp.evaluate(dev_examples)["ents_f"]
+        logging.info(f"Epoch {epoch + 1}: loss {losses.get('ner', 0.0):.1f}, dev F1 {ents_f:.3f}")
+        if ents_f > best_f:
+            best_f, stale = ents_f, 0
+            nlp.to_disk(output_dir)
+        else:
+            stale += 1
+            if stale >= patience:
+                logging.info(f"No dev improvement for {patience} epochs; stopping.")
+                break
+    logging.info(f"Best student (dev F1 {best_f:.3f}) saved to {output_dir}.")
+
+def directory_size(path):
+    """Total size in bytes of the files below path."""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+def evaluate_model(name, model_path, test_path):
+    """Return per-label F1, overall F1, docs/sec and on-disk size of a pipeline on a gold DocBin."""
+    nlp = spacy.load(model_path)
+    examples = load_examples(nlp, [test_path])
+    texts = [eg.reference.text for eg in examples]
+    list(nlp.pipe(texts[:8]))  # warm up
+    start = time.perf_counter()
+    list(nlp.pipe(texts, batch_size=16))
+    docs_per_sec = len(texts) / (time.perf_counter() - start)
+    scores = nlp.evaluate(examples)
+    per_label = {label: values["f"] for label, values in (scores.get("ents_per_type") or {}).items()}
+    logging.info(f"{name}: F1 {scores['ents_f']:.3f}, {docs_per_sec:.1f} docs/s")
+    return {"name": name, "f1": scores["ents_f"], "per_label": per_label,
+            "docs_per_sec": docs_per_sec, "size_mb": directory_size(model_path) / 1e6}
+
+def write_report(rows, filename):
+    """Write the teacher/student comparison as a Markdown table and print it."""
+    labels = sorted({label for row in rows for label in row["per_label"]})
+    header = ["model", "F1"] + [f"F1 {label}" for label in labels] + ["docs/s", "size (MB)"]
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for row in rows:
+        cells = [row["name"], f"{row['f1']:.3f}"]
+        cells += [f"{row['per_label'][label]:.3f}" if label in row["per_label"] else "-" for label in labels]
+        cells += [f"{row['docs_per_sec']:.1f}", f"{row['size_mb']:.1f}"]
+        lines.append("| " + " | ".join(cells) + " |")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    print("\n".join(lines))
+    logging.info(f"Comparison table saved to {filename}.")
+
+def main(args):
+    """Distill the transformer pipeline into a CPU-fast student and compare the two."""
+    setup_logging()
+    # Inference on CPU only; nothing here downloads models or data
+    spacy.require_cpu()
+
+    if not args.skip_labelling:
+        teacher = spacy.load(args.teacher)
+        # Silver labels on dev or test texts would leak them into training and inflate the reported F1
+        texts = load_unlabeled_texts(args.unlabeled, args.column, exclude=held_out_texts([args.dev, args.test]))
+        if args.limit:
+            texts = texts[:args.limit]
+        label_with_teacher(teacher, texts, args.silver)
+        del teacher
+
+    nlp = spacy.blank("en")
+    train_examples = load_examples(nlp, [args.silver] + args.gold_train)
+    dev_examples = load_examples(nlp, [args.dev])
+    train_student(train_examples, dev_examples, args.output, epochs=args.epochs, patience=args.patience)
+
+    rows = [evaluate_model("teacher (transformer)", args.teacher, args.test),
+            evaluate_model("student (tok2vec)", args.output, args.test)]
+    write_report(rows, args.report)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distill the transformer NER pipeline into a small CPU student.")
+    parser.add_argument('--teacher', type=str, default='models', help='Path to the teacher (transformer) pipeline')
+    parser.add_argument('--unlabeled', type=str, nargs='+', default=['output/unlabeled_catalog.txt'],
+                        help='Unlabeled catalog text: CSV files or text files with one text per line. Not the '
+                             'labelled CSV that train_pipeline.py splits; dev/test texts are dropped either way')
+    parser.add_argument('--column', type=str, default='article', help='Text column of the unlabeled CSVs')
+    parser.add_argument('--limit', type=int, default=0, help='Maximum unlabeled texts to label (0 = all)')
+    parser.add_argument('--silver', type=str, default='training/silver.spacy', help='Path to the silver DocBin')
+    parser.add_argument('--skip_labelling', action='store_true', help='Reuse an existing silver DocBin')
+    parser.add_argument('--gold_train', type=str, nargs='*', default=['training/train.spacy'], help='Gold training DocBins')
+    parser.add_argument('--dev', type=str, default='training/dev.spacy', help='Gold dev DocBin')
+    parser.add_argument('--test', type=str, default='training/test.spacy', help='Gold test DocBin for the comparison')
+    parser.add_argument('--output', type=str, default='models_fast', help='Output directory of the student pipeline')
+    parser.add_argument('--epochs', type=int, default=20, help='Maximum training epochs')
+    parser.add_argument('--patience', type=int, default=3, help='Stop after this many epochs without dev improvement')
+    parser.add_argument('--report', type=str, default='training/distill_report.md', help='Path to the comparison table')
+    args = parser.parse_args()
+
+    main(args)
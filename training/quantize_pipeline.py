@@ -0,0 +1,126 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+
+import spacy
+import torch
+from spacy.tokens import DocBin
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from ner import QUANTIZATION_FILE, transformer_shims, load_model  # noqa: E402
+
+
+def setup_logging(log_path='logs/quantizePipeline.log'):
+    """Configure logging to file and console."""
+    os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        filename=log_path,
+        filemode='w'
+    )
+    console = logging.StreamHandler()
+    console.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(levelname)s - %(message)s')
+    console.setFormatter(formatter)
+    logging.getLogger('').addHandler(console)
+
+def export_quantized(model_path, out_path):
+    """
+    Write the int8 pipeline directory: a copy of the fp32 pipeline plus a quantization marker.
+    Dynamically quantized weights cannot be restored through spaCy's from_disk, so
+    ner.load_model re-applies the (deterministic) quantization when it sees the marker.
+    """
+    if os.path.exists(out_path):
+        shutil.rmtree(out_path)
+    shutil.copytree(model_path, out_path)
+    marker = {"method": "dynamic", "dtype": "qint8", "modules": ["Linear"],
+              "component": "transformer", "source": os.path.abspath(model_path), "torch": torch.__version__}
+    with open(os.path.join(out_path, QUANTIZATION_FILE), 'w', encoding='utf-8') as f:
+        json.dump(marker, f, indent=2)
+    logging.info(f"Quantized pipeline written to {out_path}.")
+
+def weight_bytes(nlp):
+    """Bytes held by the parameters of the pipeline's PyTorch models (int8 packed weights included)."""
+    total = 0
+    for shim in transformer_shims(nlp):
+        for value in shim._model.state_dict().values():
+            tensors = value if isinstance(value, tuple) else (value,)
+            total += sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+    return total
+
+def predict(nlp, texts):
+    """Return per-document entity sets and per-document latencies (documents processed one by one)."""
+    predictions, latencies = [], []
+    for text in texts:
+        start = time.perf_counter()
+        doc = nlp(text)
+        latencies.append(time.perf_counter() - start)
+        predictions.append({(e.start_char, e.end_char, e.label_) for e in doc.ents})
+    return predictions, latencies
+
+def f1(predicted, gold):
+    """Micro-averaged entity F1 over exact (start, end, label) matches."""
+    tp = sum(len(p & g) for p, g in zip(predicted, gold))
+    n_pred = sum(len(p) for p in predicted)
+    n_gold = sum(len(g) for g in gold)
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_gold if n_gold else 0.0
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def compare(model_path, out_path, test_path, limit):
+    """Check accuracy drift and latency of the int8 pipeline against fp32 on a gold DocBin."""
+    docs = list(DocBin().from_disk(test_path).get_docs(spacy.blank("en").vocab))[:limit]
+    texts = [doc.text for doc in docs]
+    gold = [{(e.start_char, e.end_char, e.label_) for e in doc.ents} for doc in docs]
+
+    results = {}
+    for name, path, quantize in (("fp32", model_path, False), ("int8", out_path, True)):
+        nlp = load_model(path, quantize=quantize)
+        predict(nlp, texts[:4])  # warm up
+        predictions, latencies = predict(nlp, texts)
+        results[name] = {"predictions": predictions, "f1": f1(predictions, gold),
+                         "p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99),
+                         "weights_mb": weight_bytes(nlp) / 1e6}
+        del nlp
+
+    agreement = sum(a == b for a, b in zip(results["fp32"]["predictions"], results["int8"]["predictions"])) / len(texts)
+    print(f"{len(texts)} documents from {test_path}")
+    print(f"{'model':<6} {'F1':>7} {'p50 ms':>8} {'p99 ms':>8} {'weights MB':>11}")
+    for name, row in results.items():
+        print(f"{name:<6} {row['f1']:>7.3f} {row['p50'] * 1000:>8.1f} {row['p99'] * 1000:>8.1f} {row['weights_mb']:>11.1f}")
+    print(f"Documents with identical entities: {agreement:.1%}")
+    return results["fp32"]["f1"] - results["int8"]["f1"], agreement
+
+def main(args):
+    """Export the int8 pipeline, then verify drift and latency against fp32."""
+    setup_logging()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    export_quantized(args.model, args.out)
+    drift, agreement = compare(args.model, args.out, args.test, args.limit)
+    logging.info(f"F1 drift {drift:+.4f}, agreement {agreement:.1%}")
+    if drift > args.max_drift:
+        logging.error(f"F1 dropped by {drift:.4f} (> {args.max_drift}); not fit for serving.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a dynamic int8 quantized NER pipeline and check its drift.")
+    parser.add_argument('--model', type=str, default='models', help='Path to the fp32 pipeline')
+    parser.add_argument('--out', type=str, default='models_int8', help='Output directory of the int8 pipeline')
+    parser.add_argument('--test', type=str, default='training/test.spacy', help='Gold DocBin for the drift check')
+    parser.add_argument('--limit', type=int, default=500, help='Maximum number of test documents')
+    parser.add_argument('--max_drift', type=float, default=0.01, help='Maximum allowed F1 drop (absolute)')
+    parser.add_argument('--threads', type=int, default=0, help='torch threads (0 = torch default)')
+    args = parser.parse_args()
+
+    main(args)